@@ -6,7 +6,7 @@ python alarm.py --in 2 --out 5 --sr 44100 --hp 100 \
 
 """
 
-import argparse, time, math, threading
+import argparse, time, math, wave
 import numpy as np, sounddevice as sd, queue
 
 def speak_and_blink(message, led_command, times=5, delay=0.35):
@@ -35,18 +35,99 @@ def block_db(buf):
 def make_beep(sr, dur=1.5, freq=880.0):
     t = np.arange(int(sr*dur))/sr
     env = np.minimum(1.0, np.arange(len(t))/(0.02*sr)) * np.exp(-3*t)   # quick A/D
-    wave = 0.25*np.sin(2*np.pi*freq*t)*env
-    return np.column_stack([wave, wave])
-
-# Runs on a separate thread so playing the alarm cannot stall the input callback.
-# Sets the output device
-# Plays them blocking (one alarm completes before the next can start).
-def player_thread_fn(q, out_dev, sr):
-    sd.default.device = (None, out_dev)
-    while True:
-        buf = q.get()
-        if buf is None: break
-        sd.play(buf, sr, blocking=True)
+    samples = 0.25*np.sin(2*np.pi*freq*t)*env
+    return np.column_stack([samples, samples]).astype(np.float32)
+
+# Tones are synthesised once per (freq, dur) and reused, so an alert never waits for numpy
+class ToneCache:
+    def __init__(self, sr):
+        self.sr = sr
+        self.tones = {}
+
+    def get(self, freq=880.0, dur=1.5):
+        key = (float(freq), float(dur))
+        if key not in self.tones:
+            self.tones[key] = make_beep(self.sr, dur, freq)
+        return self.tones[key]
+
+# Integer PCM bytes -> floats in [-1, 1); 8-bit wav is unsigned, wider ones signed little-endian
+def pcm_to_float(raw, width):
+    if width == 1:
+        return (np.frombuffer(raw, dtype=np.uint8).astype(np.float64) - 128.0) / 128.0
+    if width == 2:
+        return np.frombuffer(raw, dtype=np.int16) / 32768.0
+    if width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        x = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        return np.where(x >= 1 << 23, x - (1 << 24), x) / 8388608.0
+    if width == 4:
+        return np.frombuffer(raw, dtype=np.int32) / 2147483648.0
+    raise ValueError(f"unsupported sample width: {width} bytes")
+
+# Loads a pre-rendered speech clip (8/16/24/32-bit PCM wav) as stereo float32 at the mixer's rate
+def load_clip(path, sr):
+    with wave.open(path, "rb") as w:
+        ch, rate, width = w.getnchannels(), w.getframerate(), w.getsampwidth()
+        try:
+            x = pcm_to_float(w.readframes(w.getnframes()), width).reshape(-1, ch)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from None
+    if rate != sr:
+        t = np.arange(int(len(x) * sr / rate)) * rate / sr
+        x = np.column_stack([np.interp(t, np.arange(len(x)), x[:, c]) for c in range(ch)])
+    if ch == 1:
+        x = np.column_stack([x[:, 0], x[:, 0]])
+    return x[:, :2].astype(np.float32)
+
+# One output stream for the whole run; its callback mixes whatever sounds are playing.
+# play() only puts the buffer on a queue, so the sound starts at the next output buffer
+# (or at an exact stream frame, at=...) instead of after opening a device.
+# A sound with a higher priority than everything playing cuts the others off (with a 5 ms fade).
+class Mixer:
+    FADE_SEC = 0.005
+
+    def __init__(self, out_dev, sr, blocksize=256):
+        self.sr = sr
+        self.pending = queue.SimpleQueue()
+        self.voices = []     # [buf, pos, start_frame, priority]
+        self.frame = 0       # frames written since the stream started
+        self.fade = np.linspace(1.0, 0.0, max(1, int(self.FADE_SEC * sr)), dtype=np.float32)[:, None]
+        self.blocksize = blocksize
+        self.stream = sd.OutputStream(samplerate=sr, channels=2, dtype="float32", blocksize=blocksize,
+                                      device=out_dev, latency="low", callback=self._cb)
+
+    def start(self):
+        self.stream.start()
+        return self
+
+    def stop(self):
+        self.stream.stop(); self.stream.close()
+
+    def play(self, buf, priority=0, at=None):
+        self.pending.put((buf, priority, at))
+
+    def _cb(self, outdata, frames, time_info, status):
+        outdata.fill(0.0)
+        while True:
+            try: buf, prio, at = self.pending.get_nowait()
+            except queue.Empty: break
+            if self.voices and prio > max(v[3] for v in self.voices):
+                # preempt: fade out what is playing now, drop what has not started yet
+                self.voices = [v for v in self.voices if v[2] < self.frame]
+                for v in self.voices:
+                    v[0] = v[0][v[1]:v[1] + len(self.fade)] * self.fade[:len(v[0]) - v[1]]
+                    v[1] = 0
+            self.voices.append([buf, 0, self.frame if at is None else max(at, self.frame), prio])
+        for v in self.voices:
+            buf, pos, start = v[0], v[1], v[2]
+            off = max(0, start - self.frame)
+            if off >= frames: continue
+            n = min(frames - off, len(buf) - pos)
+            outdata[off:off + n] += buf[pos:pos + n]
+            v[1] = pos + n
+        self.voices = [v for v in self.voices if v[1] < len(v[0])]
+        np.clip(outdata, -1.0, 1.0, out=outdata)
+        self.frame += frames
 
 def main():
     ap = argparse.ArgumentParser()
@@ -59,17 +140,19 @@ def main():
     ap.add_argument("--trig", type=float, default=-28.0, help="Trigger threshold in dBFS")
     ap.add_argument("--rel",  type=float, default=-32.0, help="Release threshold in dBFS")
     ap.add_argument("--print", action="store_true", help="Print live dB and state")
+    ap.add_argument("--beep-hz", type=float, default=880.0, help="Alarm tone frequency")
+    ap.add_argument("--clip", default=None, help="Speech clip (.wav) played after the beep")
     args = ap.parse_args()
 
 
     sd.default.device = (args.in_dev, args.out_dev)
     sr = args.sr
-    beep = make_beep(sr)
+    tones = ToneCache(sr)
+    beep = tones.get(args.beep_hz)
+    clip = load_clip(args.clip, sr) if args.clip else None
 
-    # Starts the output thread that will play alarms posted to q
-    q = queue.Queue()
-    tplayer = threading.Thread(target=player_thread_fn, args=(q, args.out_dev, sr), daemon=True)
-    tplayer.start()
+    # Opens the output once; alarms are mixed into it from the input callback
+    mixer = Mixer(args.out_dev, sr).start()
 
     # rolling window for hold logic
     # We don’t trigger on a single loud block; we require the average over a short window (--hold) to exceed --trig.
@@ -103,7 +186,10 @@ def main():
             if avg >= args.trig:
                 state = "fired"
                 last_fire = now
-                q.put(beep)
+                at = mixer.frame + mixer.blocksize     # start of the next output buffer
+                mixer.play(beep, priority=1, at=at)
+                if clip is not None:
+                    mixer.play(clip, priority=1, at=at + len(beep))
                 speak_and_blink("Volume is too loud. Calm down", "YELLOW_BLINK")
         elif state == "fired":
             # wait for cooldown start condition
@@ -118,8 +204,8 @@ def main():
 
     # Opens the input device at your chosen sample rate.
     # Note blocksize=1024 gives ~23 ms blocks at 44.1 kHz
-    # The main thread just idles; the callback runs on PortAudio’s thread; the player thread waits for beeps.
-    # On Ctrl-C, we send None to the player’s queue to stop that thread cleanly.
+    # The main thread just idles; the callbacks run on PortAudio’s threads.
+    # On Ctrl-C, we close the output stream.
     with sd.InputStream(samplerate=sr, channels=1, callback=in_cb, blocksize=1024, device=(args.in_dev, None)):
         print("Listening… Ctrl+C to stop.")
         try:
@@ -127,7 +213,7 @@ def main():
         except KeyboardInterrupt:
             pass
         finally:
-            q.put(None)
+            mixer.stop()
 
 if __name__ == "__main__":
     main()
@@ -174,6 +174,21 @@ def save_zones(outpath: str, target_size=None):
         "frame_size": {"width": final_w, "height": final_h},
         "zones": scaled_zones
     }
+    # Keep every hand-edited key this tool does not own (led_segments, mic_channels,
+    # sound_bearings, mic_array, ...) when re-saving zones
+    if os.path.exists(outpath):
+        try:
+            with open(outpath, "r", encoding="utf-8") as f:
+                old = json.load(f)
+        except Exception as e:
+            # Overwriting would lose the mic/LED settings in it; leave the file for the user to fix
+            print(f"[ERR] Not saving: could not read existing {outpath} ({e}). Fix or remove it first.")
+            return
+        kept = [key for key in old if key not in payload]
+        for key in kept:
+            payload[key] = old[key]
+        if kept:
+            print(f"[INFO] Kept {', '.join(kept)} from the existing file")
     os.makedirs(os.path.dirname(outpath) or ".", exist_ok=True)
     with open(outpath, "w", encoding="utf-8") as f:
         json.dump(payload, f, ensure_ascii=False, indent=2)
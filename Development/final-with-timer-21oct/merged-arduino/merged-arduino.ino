@@ -5,126 +5,391 @@
 #include <Adafruit_NeoPixel.h>
 
 #define PIN 6
+// strip.show() keeps interrupts off for ~30 us per pixel (0.9 ms at 30 px). At 115200 baud a byte
+// lands every 87 us and the UART holds only 2, so bytes that arrive during a show are lost; CRC +
+// NACK/resend recovers them. Pushing only dirty frames keeps that rare at 30 px, but at a few hundred
+// pixels (9 ms per show at 300 px) most commands sent while the strip animates would be dropped.
 #define NUMPIXELS 30
+#define MAX_SEGMENTS 6
+
+// Framed serial protocol, keep in sync with pressure_cook/protocol.py
+// SYNC | VERSION | SEQ | OPCODE | LEN | PAYLOAD[LEN] | CRC8 (poly 0x07 over VERSION..PAYLOAD)
+#define BAUD_RATE      115200
+#define PROTO_SYNC     0xA5
+#define PROTO_VERSION  1
+#define MAX_PAYLOAD    32
+#define FRAME_TIMEOUT_MS 50
+
+#define OP_PING        0x01
+#define OP_SET_STATE   0x02
+#define OP_ANIMATE     0x03
+#define OP_SEG_CONFIG  0x04   // n, then n x (start u16 LE, count u16 LE)
+#define OP_SEG_UPDATE  0x05   // k x (seg, flags, r, g, b, on/10ms, off/10ms)
+
+#define SEG_ENTRY_SIZE 7
+#define SEG_ACTIVE     0x01
+#define OP_ACK         0x80
+#define OP_NACK        0x81
+#define OP_STATS       0x82   // unsolicited telemetry, once per STATS_PERIOD_MS
+#define OP_DONE        0x83   // an ANIMATE program finished and fell back by itself
+#define OP_READY       0x84   // sent once at the end of setup() so the host needs no fixed sleep
+
+#define DONE_COMPLETED 0
+
+#define STATS_PERIOD_MS 1000
+
+#define STATUS_OK         0
+#define STATUS_BAD_OPCODE 1
+#define STATUS_BAD_PARAM  2
+
+#define NACK_BAD_CRC     1
+#define NACK_BAD_VERSION 2
+#define NACK_TOO_LONG    3
 
 Adafruit_NeoPixel strip(NUMPIXELS, PIN, NEO_GRB + NEO_KHZ800);
 
-enum State { OFF, GREEN, BLUE_BLINK, RED_BLINK, YELLOW_BLINK, PINK_BLINK, WHITE_BLINK };
+enum State { OFF, GREEN, BLUE_BLINK, RED_BLINK, YELLOW_BLINK, PINK_BLINK, WHITE_BLINK, CUSTOM };
 State ledState = OFF;
 
-bool ledOn = false;
-unsigned long lastToggle = 0;
-uint16_t blinkOn = 250, blinkOff = 250;
+// The running animation. Steady colours are animations with offMs == 0;
+// SET_STATE presets never expire, ANIMATE programs end by repeat count or duration.
+struct Anim {
+  uint32_t color;
+  uint16_t onMs, offMs;
+  bool byCount;
+  uint8_t repeatsLeft;        // blink cycles left when limited by count
+  bool byTime;
+  unsigned long endAt;        // millis() deadline when limited by duration
+  uint8_t fallback;           // State entered when the program finishes
+  uint8_t seq;                // ANIMATE sequence number, echoed in OP_DONE
+  bool on;
+  unsigned long lastToggle;
+};
+Anim anim;
+
+// Per-station segments drawn on top of the whole-strip animation while active,
+// so several station alerts can show at once
+struct Segment {
+  uint16_t start, count;
+  bool active;
+  uint32_t color;
+  uint16_t onMs, offMs;       // offMs == 0 -> steady
+  bool on;
+  unsigned long lastToggle;
+};
+Segment segs[MAX_SEGMENTS];
+uint8_t numSegments = 0;
+
+bool frameDirty = true;          // push pixels only when the frame actually changes
 
+// Loop-rate telemetry
+uint32_t loopCount = 0;
+uint16_t showCount = 0;
+unsigned long lastStats = 0;
 
-void fillColor(uint8_t r, uint8_t g, uint8_t b) {
-  for (int i = 0; i < NUMPIXELS; i++) {
-    strip.setPixelColor(i, strip.Color(r, g, b));
+
+uint32_t stateColor(State s) {
+  switch (s) {
+    case GREEN:        return strip.Color(0, 255, 0);
+    case BLUE_BLINK:   return strip.Color(0, 0, 255);
+    case RED_BLINK:    return strip.Color(255, 0, 0);
+    case YELLOW_BLINK: return strip.Color(255, 180, 0);
+    case PINK_BLINK:   return strip.Color(255, 50, 180);
+    case WHITE_BLINK:  return strip.Color(255, 255, 255);
+    default:           return 0;
   }
-  strip.show();
+}
+
+
+void render() {
+  if (!frameDirty) return;
+  if (anim.on) strip.fill(anim.color, 0, NUMPIXELS);
+  else strip.clear();
+  for (uint8_t i = 0; i < numSegments; i++) {
+    if (segs[i].active) strip.fill(segs[i].on ? segs[i].color : 0, segs[i].start, segs[i].count);
+  }
+  strip.show();          // disables interrupts while clocking out pixels, so keep it rare
+  showCount++;
+  frameDirty = false;
 }
 
 
 void enter(State s) {
   ledState = s;
-  ledOn = false;
-  lastToggle = millis();
-  strip.clear();
-  strip.show();
+  anim.color = stateColor(s);
+  anim.on = (s == GREEN);
+  anim.byCount = false;
+  anim.byTime = false;
+  anim.lastToggle = millis();
+  frameDirty = true;
   
   // Set timing for each blink mode
   switch (s) {
-    case BLUE_BLINK:   blinkOn = 200; blinkOff = 200; break;
-    case RED_BLINK:    blinkOn = 250; blinkOff = 250; break;
-    case YELLOW_BLINK: blinkOn = 350; blinkOff = 350; break;
-    case PINK_BLINK:   blinkOn = 400; blinkOff = 400; break;
-    case WHITE_BLINK:  blinkOn = 300; blinkOff = 300; break;
-    default: break;
+    case BLUE_BLINK:   anim.onMs = 200; anim.offMs = 200; break;
+    case RED_BLINK:    anim.onMs = 250; anim.offMs = 250; break;
+    case YELLOW_BLINK: anim.onMs = 350; anim.offMs = 350; break;
+    case PINK_BLINK:   anim.onMs = 400; anim.offMs = 400; break;
+    case WHITE_BLINK:  anim.onMs = 300; anim.offMs = 300; break;
+    default:           anim.onMs = 0;   anim.offMs = 0;   break;   // steady
+  }
+}
+
+
+// ANIMATE payload: r, g, b, on_ms (u16 LE), off_ms (u16 LE), repeats, duration_ms (u16 LE), fallback
+bool startAnimation(uint8_t seq, const uint8_t *p, uint8_t len) {
+  if (len < 11 || p[10] > WHITE_BLINK) return false;
+  unsigned long now = millis();
+  ledState = CUSTOM;
+  anim.color = strip.Color(p[0], p[1], p[2]);
+  anim.onMs = p[3] | (p[4] << 8);
+  anim.offMs = p[5] | (p[6] << 8);
+  anim.byCount = p[7] > 0 && anim.offMs > 0;
+  anim.repeatsLeft = p[7];
+  unsigned long durMs = p[8] | (p[9] << 8);
+  if (p[7] > 0 && anim.offMs == 0) {
+    // Steady with a repeat count: hold for that many on-periods (or the duration, if shorter)
+    unsigned long steadyMs = (unsigned long)(anim.onMs ? anim.onMs : 1) * p[7];
+    if (durMs == 0 || steadyMs < durMs) durMs = steadyMs;
+  }
+  anim.byTime = durMs > 0;
+  anim.endAt = now + durMs;
+  anim.fallback = p[10];
+  anim.seq = seq;
+  anim.on = true;              // show the alert colour straight away
+  anim.lastToggle = now;
+  frameDirty = true;
+  return true;
+}
+
+
+void finishAnimation() {
+  uint8_t seq = anim.seq;
+  uint8_t reason = DONE_COMPLETED;
+  enter((State)anim.fallback);
+  render();
+  sendFrame(seq, OP_DONE, &reason, 1);
+}
+
+
+bool configureSegments(const uint8_t *p, uint8_t len) {
+  if (len < 1 || p[0] > MAX_SEGMENTS || len < 1 + 4 * p[0]) return false;
+  for (uint8_t i = 0; i < p[0]; i++) {
+    const uint8_t *e = p + 1 + 4 * i;
+    uint16_t start = e[0] | (e[1] << 8);
+    uint16_t count = e[2] | (e[3] << 8);
+    if ((uint32_t)start + count > NUMPIXELS) return false;
+  }
+  numSegments = p[0];
+  for (uint8_t i = 0; i < numSegments; i++) {
+    const uint8_t *e = p + 1 + 4 * i;
+    segs[i].start = e[0] | (e[1] << 8);
+    segs[i].count = e[2] | (e[3] << 8);
+    segs[i].active = false;
+  }
+  frameDirty = true;
+  return true;
+}
+
+
+bool updateSegments(const uint8_t *p, uint8_t len) {
+  if (len % SEG_ENTRY_SIZE) return false;
+  for (uint8_t off = 0; off < len; off += SEG_ENTRY_SIZE) {
+    if (p[off] >= numSegments) return false;
+  }
+  unsigned long now = millis();
+  for (uint8_t off = 0; off < len; off += SEG_ENTRY_SIZE) {
+    const uint8_t *e = p + off;
+    Segment &sg = segs[e[0]];
+    sg.active = e[1] & SEG_ACTIVE;
+    sg.color = strip.Color(e[2], e[3], e[4]);
+    sg.onMs = e[5] * 10;
+    sg.offMs = e[6] * 10;
+    sg.on = true;
+    sg.lastToggle = now;
+  }
+  frameDirty = true;
+  return true;
+}
+
+
+void updateSegmentBlinks(unsigned long now) {
+  for (uint8_t i = 0; i < numSegments; i++) {
+    Segment &sg = segs[i];
+    if (!sg.active || sg.offMs == 0) continue;
+    if (now - sg.lastToggle >= (sg.on ? sg.onMs : sg.offMs)) {
+      sg.on = !sg.on;
+      sg.lastToggle = now;
+      frameDirty = true;
+    }
+  }
+}
+
+
+void updateAnimation(unsigned long now) {
+  if (anim.offMs > 0 && now - anim.lastToggle >= (anim.on ? anim.onMs : anim.offMs)) {
+    anim.on = !anim.on;
+    anim.lastToggle = now;
+    frameDirty = true;
+    if (!anim.on && anim.byCount && --anim.repeatsLeft == 0) { finishAnimation(); return; }
   }
+  if (anim.byTime && (long)(now - anim.endAt) >= 0) finishAnimation();
 }
 
 
+void sendFrame(uint8_t seq, uint8_t op, const uint8_t *payload, uint8_t len);
+
 void setup() {
-  Serial.begin(9600);
+  Serial.begin(BAUD_RATE);
+  enter(OFF);
   strip.begin();
   strip.clear();
   strip.show();
+
+  // payload: protocol version, NUMPIXELS (u16 LE), MAX_SEGMENTS
+  uint8_t ready[4] = { PROTO_VERSION, (uint8_t)NUMPIXELS, (uint8_t)(NUMPIXELS >> 8), MAX_SEGMENTS };
+  sendFrame(0, OP_READY, ready, 4);
 }
 
 
-void handleSerial() {
-  while (Serial.available()) {
-    String command = Serial.readStringUntil('\n');
-    command.trim();
-    
-    if (command == "DEFAULT_GREEN")        enter(GREEN);
-    else if (command == "SWITCH_TASK")     enter(BLUE_BLINK);
-    else if (command == "ALARM_ON")        enter(RED_BLINK);
-    else if (command == "YELLOW_BLINK")    enter(YELLOW_BLINK);
-    else if (command == "PINK_BLINK")      enter(PINK_BLINK);
-    else if (command == "WHITE_BLINK")     enter(WHITE_BLINK);
-    else if (command == "OFF")             enter(OFF);
+uint8_t crc8(uint8_t crc, uint8_t b) {
+  crc ^= b;
+  for (uint8_t i = 0; i < 8; i++) {
+    crc = (crc & 0x80) ? (uint8_t)((crc << 1) ^ 0x07) : (uint8_t)(crc << 1);
   }
+  return crc;
 }
 
 
-void loop() {
-  handleSerial();
-  unsigned long now = millis();
-  
-  switch (ledState) {
-    case OFF:
-      strip.clear();
-      strip.show();
-      break;
-      
-    case GREEN:
-      fillColor(0, 255, 0);
+void sendFrame(uint8_t seq, uint8_t op, const uint8_t *payload, uint8_t len) {
+  uint8_t hdr[4] = { PROTO_VERSION, seq, op, len };
+  uint8_t crc = 0;
+  Serial.write(PROTO_SYNC);
+  for (uint8_t i = 0; i < 4; i++) { Serial.write(hdr[i]); crc = crc8(crc, hdr[i]); }
+  for (uint8_t i = 0; i < len; i++) { Serial.write(payload[i]); crc = crc8(crc, payload[i]); }
+  Serial.write(crc);
+}
+
+
+void sendAck(uint8_t seq, uint8_t op, uint8_t status) {
+  uint8_t p[2] = { op, status };
+  sendFrame(seq, OP_ACK, p, 2);
+}
+
+
+void sendNack(uint8_t seq, uint8_t reason) {
+  sendFrame(seq, OP_NACK, &reason, 1);
+}
+
+
+void dispatch(uint8_t seq, uint8_t op, const uint8_t *payload, uint8_t len) {
+  switch (op) {
+    case OP_PING:
+      sendAck(seq, op, STATUS_OK);
       break;
-      
-    case BLUE_BLINK:
-      if (now - lastToggle >= (ledOn ? blinkOn : blinkOff)) {
-        ledOn = !ledOn;
-        lastToggle = now;
-        if (ledOn) fillColor(0, 0, 255);
-        else { strip.clear(); strip.show(); }
-      }
+
+    case OP_SET_STATE:
+      if (len < 1 || payload[0] > WHITE_BLINK) { sendAck(seq, op, STATUS_BAD_PARAM); break; }
+      enter((State)payload[0]);
+      render();
+      sendAck(seq, op, STATUS_OK);   // strip has already been updated by render()
       break;
-      
-    case RED_BLINK:
-      if (now - lastToggle >= (ledOn ? blinkOn : blinkOff)) {
-        ledOn = !ledOn;
-        lastToggle = now;
-        if (ledOn) fillColor(255, 0, 0);
-        else { strip.clear(); strip.show(); }
-      }
+
+    case OP_ANIMATE:
+      if (!startAnimation(seq, payload, len)) { sendAck(seq, op, STATUS_BAD_PARAM); break; }
+      render();
+      sendAck(seq, op, STATUS_OK);
       break;
-      
-    case YELLOW_BLINK:
-      if (now - lastToggle >= (ledOn ? blinkOn : blinkOff)) {
-        ledOn = !ledOn;
-        lastToggle = now;
-        if (ledOn) fillColor(255, 180, 0);
-        else { strip.clear(); strip.show(); }
-      }
+
+    case OP_SEG_CONFIG:
+      if (!configureSegments(payload, len)) { sendAck(seq, op, STATUS_BAD_PARAM); break; }
+      render();
+      sendAck(seq, op, STATUS_OK);
       break;
-      
-    case PINK_BLINK:
-      if (now - lastToggle >= (ledOn ? blinkOn : blinkOff)) {
-        ledOn = !ledOn;
-        lastToggle = now;
-        if (ledOn) fillColor(255, 50, 180);
-        else { strip.clear(); strip.show(); }
-      }
+
+    case OP_SEG_UPDATE:
+      if (!updateSegments(payload, len)) { sendAck(seq, op, STATUS_BAD_PARAM); break; }
+      render();
+      sendAck(seq, op, STATUS_OK);
       break;
-      
-    case WHITE_BLINK:
-      if (now - lastToggle >= (ledOn ? blinkOn : blinkOff)) {
-        ledOn = !ledOn;
-        lastToggle = now;
-        if (ledOn) fillColor(255, 255, 255);
-        else { strip.clear(); strip.show(); }
-      }
+
+    default:
+      sendAck(seq, op, STATUS_BAD_OPCODE);
       break;
   }
-}
\ No newline at end of file
+}
+
+
+// Non-blocking frame parser: consumes whatever bytes are available, never waits.
+enum RxStep { RX_SYNC, RX_VERSION, RX_SEQ, RX_OP, RX_LEN, RX_PAYLOAD, RX_CRC };
+RxStep rxStep = RX_SYNC;
+uint8_t rxSeq, rxOp, rxLen, rxPos, rxCrc;
+uint8_t rxPayload[MAX_PAYLOAD];
+unsigned long rxLastByte = 0;
+
+void handleSerial() {
+  // Drop a half-received frame if the rest never arrives
+  if (rxStep != RX_SYNC && millis() - rxLastByte > FRAME_TIMEOUT_MS) rxStep = RX_SYNC;
+
+  while (Serial.available()) {
+    uint8_t b = Serial.read();
+    rxLastByte = millis();
+
+    switch (rxStep) {
+      case RX_SYNC:
+        if (b == PROTO_SYNC) { rxStep = RX_VERSION; rxCrc = 0; }
+        break;
+      case RX_VERSION:
+        if (b != PROTO_VERSION) { sendNack(0, NACK_BAD_VERSION); rxStep = RX_SYNC; break; }
+        rxCrc = crc8(rxCrc, b); rxStep = RX_SEQ;
+        break;
+      case RX_SEQ:
+        rxSeq = b; rxCrc = crc8(rxCrc, b); rxStep = RX_OP;
+        break;
+      case RX_OP:
+        rxOp = b; rxCrc = crc8(rxCrc, b); rxStep = RX_LEN;
+        break;
+      case RX_LEN:
+        if (b > MAX_PAYLOAD) { sendNack(rxSeq, NACK_TOO_LONG); rxStep = RX_SYNC; break; }
+        rxLen = b; rxPos = 0; rxCrc = crc8(rxCrc, b);
+        rxStep = rxLen ? RX_PAYLOAD : RX_CRC;
+        break;
+      case RX_PAYLOAD:
+        rxPayload[rxPos++] = b; rxCrc = crc8(rxCrc, b);
+        if (rxPos >= rxLen) rxStep = RX_CRC;
+        break;
+      case RX_CRC:
+        if (b == rxCrc) dispatch(rxSeq, rxOp, rxPayload, rxLen);
+        else sendNack(rxSeq, NACK_BAD_CRC);
+        rxStep = RX_SYNC;
+        break;
+    }
+  }
+}
+
+
+void sendStats(unsigned long now) {
+  // payload: loops/s (uint32 LE), strip.show() calls/s (uint16 LE)
+  uint32_t hz = loopCount * 1000UL / (now - lastStats);
+  uint8_t p[6] = {
+    (uint8_t)hz, (uint8_t)(hz >> 8), (uint8_t)(hz >> 16), (uint8_t)(hz >> 24),
+    (uint8_t)showCount, (uint8_t)(showCount >> 8)
+  };
+  sendFrame(0, OP_STATS, p, 6);
+  loopCount = 0;
+  showCount = 0;
+  lastStats = now;
+}
+
+
+void loop() {
+  handleSerial();
+  unsigned long now = millis();
+  loopCount++;
+
+  // Steady states (OFF, GREEN) never toggle, so they render once on enter()
+  updateAnimation(now);
+  updateSegmentBlinks(now);
+  render();
+
+  if (now - lastStats >= STATS_PERIOD_MS) sendStats(now);
+}
@@ -0,0 +1,9 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for the Pressure Cook monitor.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""The Pressure Cook monitor as a package.
+
+Importing any module here has no side effects; the monitor starts from
+pressure_cook.monitor.main() (time-up-merged.py or `python -m pressure_cook`).
+"""
@@ -0,0 +1,10 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for the monitor entry point.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""python -m pressure_cook  (same as time-up-merged.py)"""
+
+from .monitor import main
+
+if __name__ == "__main__":
+    main()
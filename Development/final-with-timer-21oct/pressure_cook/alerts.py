@@ -0,0 +1,162 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for alert priorities.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and how the code priorities and arduino connections should be done at all times.
+
+"""Alert arbitration: priorities, speech + LED blink, task-switch countdown."""
+
+import time
+
+from . import protocol
+from .tracing import hop
+
+# Alert priority levels
+PRIO_SOUND     = 1
+PRIO_MARKER    = 2
+PRIO_COUNTDOWN = 3
+
+# An alert that can't be spoken within this many seconds is stale and dropped
+SPEECH_TTL_SEC = 3.0
+
+
+class AlertController:
+    """Priority-based alerts on top of a Speaker and an LED link.
+
+    Higher priority pre-empts lower; lower won't interrupt higher. Repeats
+    of an alert are left to the speech queue, which merges them by tag and
+    drops them once stale. Each alert bumps `blink_token`, so anything still tied to an older token (a blink
+    program finishing, a countdown in progress) knows it was superseded.
+    """
+
+    def __init__(self, led_link, speaker):
+        self.led_link = led_link
+        self.speaker = speaker
+        self.current_priority = 0
+        self.blink_token = 0
+        self.blink_active = False
+        self.led_state = "GREEN"
+        self.alert_hold_until = 0.0  # speech-only alerts (LEDs shown per station) hold priority until then
+        self._blink_programs = {}    # ANIMATE seq -> blink_token that started it
+        led_link.on_done = self.on_blink_done
+
+    def send_led_state(self, state):
+        """Send LED command to Arduino if state changed (ACKed by the link thread)."""
+        if state != self.led_state:
+            if state not in protocol.STATE_IDS:
+                state = "OFF"
+            self.led_link.set_state(state)
+            self.led_state = state
+
+    def blink_led(self, led_command, times=5, delay=0.35, my_token=None, traces=()):
+        """Start an on-device blink program; the Arduino falls back to GREEN by itself.
+        With led_command=None the strip is left alone and priority is held for the same time."""
+        if my_token is None:
+            return
+
+        if led_command is None:
+            self.blink_active = True
+            self.alert_hold_until = time.time() + max(0.2, times * (delay * 2.0))
+            return
+
+        period_ms = int(max(0.1, delay) * 1000)
+        self.blink_active = True
+        seq = self.led_link.animate(protocol.STATE_COLORS.get(led_command, (255, 255, 255)),
+                                    period_ms, period_ms, repeats=max(1, times),
+                                    fallback="GREEN", label=led_command, traces=traces)
+        self.led_state = led_command
+        self._blink_programs.clear()     # only the newest program can still complete
+        self._blink_programs[seq] = my_token
+
+    def on_blink_done(self, seq, fallback):
+        """Called by the LED link when the Arduino reports a blink program finished."""
+        my_token = self._blink_programs.pop(seq, None)
+        if my_token is None:
+            return
+        if my_token == self.blink_token:
+            self.led_state = fallback
+            self.blink_active = False
+            self.current_priority = 0
+
+    def speak_and_blink(self, message, led_command, times=5, delay=0.35, priority=PRIO_SOUND, tag=None,
+                        ttl=SPEECH_TTL_SEC, traces=()):
+        """Trigger an alert with TTS and LED blink at given priority level.
+        Higher priority cuts off lower-priority speech; lower won't interrupt higher.
+        Returns False if a higher-priority alert kept this one from showing."""
+        if priority < self.current_priority:
+            return False
+        hop(traces, "arbitration")
+
+        self.speaker.preempt(priority)
+
+        self.blink_token += 1
+        self.current_priority = priority
+        my_token = self.blink_token
+
+        self.speaker.speak(message, tag=tag, priority=priority, ttl=ttl, coalesce=True, traces=traces)
+        self.blink_led(led_command, times=times, delay=delay, my_token=my_token, traces=traces)
+        return True
+
+    def release_hold(self, now):
+        """Release a speech-only alert once its hold time is over."""
+        if self.alert_hold_until and now >= self.alert_hold_until:
+            self.alert_hold_until = 0.0
+            if self.blink_active and self.current_priority == PRIO_MARKER:
+                self.blink_active = False
+                self.current_priority = 0
+
+    def clear_sound_alert(self, back_to_green):
+        """Volume went from loud to quiet: drop the sound alert if it is the one showing."""
+        self.speaker.withdraw("sound")
+        if self.current_priority == PRIO_SOUND:
+            self.blink_token += 1
+            self.blink_active = False
+            self.current_priority = 0
+            if back_to_green:
+                self.send_led_state("GREEN")
+
+    def countdown_task_switch(self):
+        """Run the task switch countdown with TTS and blue LED blink."""
+        self.speaker.preempt(PRIO_COUNTDOWN)
+        self.current_priority = PRIO_COUNTDOWN
+
+        self.blink_token += 1
+        my_token = self.blink_token
+
+        self.send_led_state("BLUE_BLINK")
+
+        self.speaker.speak("Please find a new stations soon", tag="countdown", priority=PRIO_COUNTDOWN)
+        for n in range(5, 0, -1):
+            if my_token != self.blink_token:
+                return
+            self.speaker.speak(str(n), tag="countdown", priority=PRIO_COUNTDOWN)
+
+        if my_token != self.blink_token:
+            return
+        self.speaker.speak("Go to a new station now", tag="countdown", priority=PRIO_COUNTDOWN)
+
+        # Wait for all countdown TTS to finish
+        while my_token == self.blink_token and self.speaker.busy():
+            time.sleep(0.05)
+
+        if my_token == self.blink_token:
+            self.current_priority = 0
+            self.send_led_state("GREEN")
+
+    def final_timeout(self):
+        """Final warning before the session shuts down; blocks until it has played."""
+        self.speaker.cancel()
+        self.blink_token += 1
+
+        self.send_led_state("OFF")
+        time.sleep(0.5)
+
+        self.speak_and_blink(
+            "You have been too slow. Please speed up.",
+            "WHITE_BLINK",
+            times=8,
+            delay=0.3,
+            ttl=None
+        )
+
+        time.sleep(8 * 0.6 + 3)
+
+        self.send_led_state("OFF")
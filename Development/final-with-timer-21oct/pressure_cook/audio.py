@@ -0,0 +1,391 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for sound recognition.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""Microphone loudness monitoring: high-pass filter, block dBFS and hysteresis."""
+
+import json
+import math
+import os
+
+import numpy as np
+
+from .features import FeatureExtractor
+
+BLOCKSIZE = 1024
+HP_CUTOFF = 100.0
+
+_HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEVICE_CACHE_PATH = os.path.join(_HERE, "config", "audio_device_cache.json")
+
+
+def find_input_by_name_substring(sub):
+    """Find audio input device whose name contains the given substring."""
+    import sounddevice as sd
+    if not sub:
+        return None
+    for i, d in enumerate(sd.query_devices()):
+        if d.get("max_input_channels", 0) > 0 and sub.lower() in d.get("name","").lower():
+            return i
+    return None
+
+
+def find_input_by_name(name):
+    """Index of the input device called exactly `name` (indices change when USB devices come and go)."""
+    import sounddevice as sd
+    for i, d in enumerate(sd.query_devices()):
+        if d.get("max_input_channels", 0) > 0 and d.get("name") == name:
+            return i
+    return None
+
+
+def _input_name(idx):
+    """Name of input device `idx`, or None if there is no such input."""
+    import sounddevice as sd
+    try:
+        info = sd.query_devices(idx)
+    except Exception:
+        return None
+    return info.get("name") if info.get("max_input_channels", 0) > 0 else None
+
+
+def _load_device_cache(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_device_cache(cache, path):
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠ Could not write {path}: {e}")
+
+
+def resolve_input_device(in_dev=None, in_name=None, cache_path=None):
+    """Figure out which audio input to use: explicit index, name match, or system default.
+
+    With `cache_path`, the device found for an --in-name is remembered by
+    index and name; next time it is reused after a single device query if
+    that index still has the same name, so startup skips the full scan.
+    """
+    import sounddevice as sd
+    if in_dev is not None:
+        return in_dev
+    if in_name:
+        cache = _load_device_cache(cache_path) if cache_path else {}
+        hit = cache.get(in_name)
+        if hit and _input_name(hit.get("index")) == hit.get("name"):
+            return hit["index"]
+        idx = find_input_by_name_substring(in_name)
+        if idx is not None:
+            if cache_path:
+                cache[in_name] = {"index": idx, "name": _input_name(idx)}
+                _save_device_cache(cache, cache_path)
+            return idx
+    di = sd.default.device
+    return di[0] if isinstance(di, (list, tuple)) else di
+
+
+class HighPass1:
+    """Simple high-pass filter to cut out low-frequency rumble.
+    State carries over between blocks so the stream is filtered continuously.
+
+    y[n] = a*(y[n-1] + x[n] - x[n-1]) is evaluated in closed form,
+    y[k] = a^(k+1) * (y[-1] + sum_{j<=k} a^-j * dx[j]), with one cumsum per
+    chunk, so a (frames, channels) block filters every channel at once
+    without a Python loop over samples. Chunks are short enough that a^-j
+    stays below 1e6 and float64 keeps full precision.
+    """
+
+    def __init__(self, sr, fc=100.0):
+        dt = 1.0/sr
+        RC = 1.0/(2*math.pi*fc)
+        self.a = RC/(RC+dt)
+        self.xn1 = None
+        self.yn1 = None
+        self.chunk = max(16, int(math.log(1e6) / -math.log(self.a)))
+        j = np.arange(self.chunk)
+        self._pow = self.a ** (j + 1.0)        # a^(k+1)
+        self._inv = self.a ** (-j.astype(float))  # a^-j
+
+    def __call__(self, x):
+        n = len(x)
+        xs = x.reshape(n, -1).astype(np.float64)
+        if self.xn1 is None or self.xn1.shape != xs.shape[1:]:
+            self.xn1 = np.zeros(xs.shape[1:])
+            self.yn1 = np.zeros(xs.shape[1:])
+        dx = np.empty_like(xs)
+        dx[0] = xs[0] - self.xn1
+        np.subtract(xs[1:], xs[:-1], out=dx[1:])
+        y = np.empty_like(xs)
+        yn1 = self.yn1
+        for s in range(0, n, self.chunk):
+            m = min(self.chunk, n - s)
+            acc = np.cumsum(dx[s:s + m] * self._inv[:m, None], axis=0)
+            acc += yn1
+            np.multiply(acc, self._pow[:m, None], out=y[s:s + m])
+            yn1 = y[s + m - 1]
+        if n:
+            self.xn1 = xs[-1].copy()
+            self.yn1 = yn1.copy()
+        return y.reshape(x.shape).astype(x.dtype, copy=False)
+
+
+class Decimator:
+    """Anti-aliased integer downsampling (e.g. 48 kHz -> 16 kHz with factor 3).
+
+    Windowed-sinc FIR low-pass (Hamming, cutoff at the new Nyquist) followed
+    by keeping every `factor`-th sample; only the kept outputs are computed.
+    The history is stored channel-major and each output phase has a strided
+    (channels, outputs, taps) view on it, built once per block size; a block
+    copies its view into a contiguous buffer and runs one matrix-vector
+    product, which is ~2.5x faster than a strided matmul on sliding windows.
+    The last taps-1 input samples and the output phase carry over, so
+    consecutive blocks decimate like one continuous stream. Adds (taps-1)/2
+    input samples of delay.
+    """
+
+    def __init__(self, factor, taps=None):
+        self.factor = int(factor)
+        self.taps = taps or 16 * self.factor + 1
+        n = np.arange(self.taps) - (self.taps - 1) / 2.0
+        fc = 0.5 / self.factor
+        h = 2 * fc * np.sinc(2 * fc * n) * np.hamming(self.taps)
+        self.h = (h / h.sum())[::-1].astype(np.float32)    # reversed for the dot product
+        self._ext = None
+        self._views = {}
+        self._work = None
+        self._phase = 0
+
+    @property
+    def delay_samples(self):
+        return (self.taps - 1) / 2.0
+
+    def _setup(self, n, ch):
+        keep = self.taps - 1
+        old = self._ext
+        self._ext = np.zeros((ch, keep + n), np.float32)
+        if old is not None and old.shape[0] == ch:
+            self._ext[:, :keep] = old[:, :keep]
+        s0, s1 = self._ext.strides
+        # window j of phase p covers ext[:, p + j*factor : p + j*factor + taps]
+        self._views = {p: np.lib.stride_tricks.as_strided(
+                           self._ext[:, p:], shape=(ch, len(range(p, n, self.factor)), self.taps),
+                           strides=(s0, s1 * self.factor, s1), writeable=False)
+                       for p in range(self.factor)}
+        self._work = np.empty((ch, len(range(0, n, self.factor)), self.taps), np.float32)
+
+    def __call__(self, x):
+        n = len(x)
+        xs = x.reshape(n, -1)
+        ch = xs.shape[1]
+        keep = self.taps - 1
+        if self._ext is None or self._ext.shape != (ch, keep + n):
+            self._setup(n, ch)
+        ext = self._ext
+        ext[:, keep:] = xs.T
+        win = self._views[self._phase]
+        work = self._work[:, :win.shape[1]]
+        np.copyto(work, win)
+        y = (work.reshape(-1, self.taps) @ self.h).reshape(ch, -1).T
+        self._phase = (self._phase - n) % self.factor
+        ext[:, :keep] = ext[:, n:].copy()
+        return y if x.ndim > 1 else y[:, 0]
+
+
+def block_db(buf):
+    """Convert RMS of audio block to dBFS (0 dBFS = full scale)."""
+    rms = np.sqrt(np.mean(buf**2) + 1e-12)
+    return 20.0 * math.log10(rms + 1e-12)
+
+
+class NoiseFloorTracker:
+    """Slow running estimate of the room's background level in dBFS.
+
+    Follows quiet blocks down quickly and louder ones up slowly (time constants
+    tau_sec/10 and tau_sec), so an extractor fan switching on moves it within
+    a minute or so. It is only fed background blocks: LoudnessMonitor skips
+    blocks at or above the release threshold and everything while the room
+    is loud, so the event being detected never lifts its own thresholds.
+    One float of state; update() is O(1) per block.
+    """
+
+    def __init__(self, block_sec, tau_sec=30.0, initial_db=None):
+        self.alpha_rise = 1.0 - math.exp(-block_sec / max(tau_sec, block_sec))
+        self.alpha_fall = 1.0 - math.exp(-block_sec / max(tau_sec / 10.0, block_sec))
+        self.floor_db = initial_db
+
+    def update(self, db):
+        if self.floor_db is None:
+            self.floor_db = db
+        elif db < self.floor_db:
+            self.floor_db += self.alpha_fall * (db - self.floor_db)
+        else:
+            self.floor_db += self.alpha_rise * (db - self.floor_db)
+        return self.floor_db
+
+
+class LoudnessMonitor:
+    """Moving average of block dBFS over `hold_sec` with trigger/release hysteresis.
+
+    callback() has the sounddevice InputStream signature and runs on the
+    audio thread; the vision loop only reads `volume_loud`, `last_avg_db`,
+    the effective thresholds and `features`, the BlockFeatures of the latest
+    block (replaced, never mutated, so readers always see a whole record).
+    Report lines go to `log` (print by default); AudioPipeline passes a
+    queue so nothing is printed on the audio thread.
+
+    All channels of the block are filtered and levelled together (one mic
+    per station). `channel_avg_db` holds each channel's moving average; the
+    loudest one drives the hysteresis and is reported as `loud_channel` /
+    `loud_station` (via `channel_stations`). The features are computed on
+    the block's loudest channel. in_channel=N restricts analysis to one
+    channel, as before.
+
+    With adaptive=True both thresholds move with a NoiseFloorTracker: they
+    shift by as much as the floor has moved from `base_floor_db` (the
+    calibrated floor, or the floor after the first `ADAPT_WARMUP_SEC`),
+    clamped to +-adapt_range_db, so the trigger/release gap never changes.
+    """
+
+    ADAPT_WARMUP_SEC = 5.0
+    ADAPT_LOG_STEP_DB = 1.0
+
+    def __init__(self, samplerate, trig_db=-28.0, rel_db=-32.0, hold_sec=0.8,
+                 hp_cutoff=HP_CUTOFF, in_channel=None, print_audio=False, blocksize=BLOCKSIZE,
+                 adaptive=False, adapt_range_db=6.0, adapt_tau_sec=30.0, base_floor_db=None,
+                 vad=None, channel_stations=None, localizer=None, decimate=1, log=print):
+        # Optional decimation right after capture; everything below runs at the reduced rate
+        self.decimator = Decimator(decimate) if decimate > 1 else None
+        if self.decimator is not None:
+            samplerate = samplerate / decimate
+            blocksize = blocksize // decimate
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.trig_db = trig_db
+        self.rel_db = rel_db
+        self.eff_trig_db = trig_db
+        self.eff_rel_db = rel_db
+        self.hold_sec = hold_sec
+        self.in_channel = in_channel
+        self.channel_stations = dict(channel_stations or {})
+        self.print_audio = print_audio
+        self.log = log
+        self.hp = HighPass1(samplerate, hp_cutoff) if hp_cutoff > 0 else None
+        self.extractor = FeatureExtractor(samplerate, blocksize, log=log)
+        self.features = self.extractor.last
+        self.vad = vad    # optional SpectralVad, fed the same features
+        self.localizer = localizer    # optional TdoaLocalizer, gets copies of loud blocks
+
+        # Ring buffer for moving average over hold_sec
+        block_dur = blocksize / float(samplerate)
+        self._blocks_need = max(1, int(hold_sec / block_dur))
+        self._ring = None      # (blocks, channels), sized on the first block
+        self._ring_sum = None
+        self._rp = 0
+        self.channel_avg_db = np.zeros(0)
+        self.loud_channel = 0
+
+        # Adaptive thresholds
+        self.floor = NoiseFloorTracker(block_dur, adapt_tau_sec, base_floor_db) if adaptive else None
+        self.adapt_range_db = adapt_range_db
+        self.base_floor_db = base_floor_db
+        self._warmup_blocks = 0 if base_floor_db is not None else int(self.ADAPT_WARMUP_SEC / block_dur)
+        self._logged_shift = 0.0
+
+        self.volume_loud = False
+        self.last_avg_db = rel_db - 20
+
+    def callback(self, indata, frames, time_info, status):
+        """Audio callback - processes blocks and updates volume state."""
+        if status and self.print_audio:
+            self.log(str(status))
+
+        # (frames, channels), whatever the device delivered
+        x = indata.reshape(len(indata), -1)
+        if self.in_channel is not None:
+            x = x[:, self.in_channel:self.in_channel + 1]
+        if self.decimator is not None:
+            x = self.decimator(x)
+
+        if self.hp is not None:
+            x = self.hp(x)
+
+        # Per-channel block level in one pass
+        ch_db = 10.0 * np.log10(np.einsum("ij,ij->j", x, x) / max(len(x), 1) + 1e-12)
+        if self._ring is None or self._ring.shape[1] != len(ch_db):
+            self._ring = np.full((self._blocks_need, len(ch_db)), self.rel_db - 20.0)
+            self._ring_sum = self._ring.sum(axis=0)
+        self._ring_sum += ch_db - self._ring[self._rp]
+        self._ring[self._rp] = ch_db
+        self._rp = (self._rp + 1) % len(self._ring)
+        self.channel_avg_db = ch_avg = self._ring_sum / len(self._ring)
+
+        if self.localizer is not None and x.shape[1] > max(self.localizer.pair) \
+                and ch_db.max() >= self.eff_rel_db:
+            self.localizer.submit(x)
+
+        self.features = f = self.extractor.compute(x[:, int(np.argmax(ch_db))])
+        db = f.rms_db
+        if self.vad is not None:
+            self.vad.update(f)
+
+        self.loud_channel = loud = int(np.argmax(ch_avg))
+        avg = float(ch_avg[loud])
+        self.last_avg_db = avg
+
+        if self.floor is not None:
+            # Only background blocks teach the floor, not the event being detected
+            self._adapt(db, learn=not self.volume_loud and db < self.eff_rel_db)
+
+        # Hysteresis-based state switching
+        if avg >= self.eff_trig_db:
+            self.volume_loud = True
+        elif avg <= self.eff_rel_db:
+            self.volume_loud = False
+
+        if self.print_audio and self._rp == 0:
+            state = "LOUD" if self.volume_loud else "quiet"
+            line = f"audio avg dBFS={avg:6.1f} ({state})"
+            if len(ch_avg) > 1:
+                line += "  ch=[" + " ".join(f"{v:6.1f}" for v in ch_avg) + "]"
+            if self.floor is not None:
+                line += (f"  floor={self.floor.floor_db:6.1f}  "
+                         f"trig={self.eff_trig_db:6.1f} rel={self.eff_rel_db:6.1f}")
+            line += (f"  peak={f.peak_db:6.1f} crest={f.crest_db:4.1f} zcr={f.zcr:.3f} "
+                     f"centroid={f.centroid_hz:5.0f}Hz speech={f.speech_ratio:.2f} flat={f.flatness:.2f}")
+            if self.vad is not None:
+                line += f"  voice={'yes' if self.vad.voice_active else 'no'}"
+            self.log(line)
+
+    @property
+    def loud_station(self):
+        """Station of the loudest mic (None if that channel isn't mapped)."""
+        ch = self.loud_channel if self.in_channel is None else self.in_channel
+        return self.channel_stations.get(ch)
+
+    def _adapt(self, db, learn=True):
+        """Move the effective thresholds with the noise floor (within +-adapt_range_db)."""
+        if not learn:
+            return
+        floor = self.floor.update(db)
+        if self._warmup_blocks > 0:
+            self._warmup_blocks -= 1
+            if self._warmup_blocks == 0:
+                self.base_floor_db = floor
+            return
+        shift = min(self.adapt_range_db, max(-self.adapt_range_db, floor - self.base_floor_db))
+        self.eff_trig_db = self.trig_db + shift
+        self.eff_rel_db = self.rel_db + shift
+        if abs(shift - self._logged_shift) >= self.ADAPT_LOG_STEP_DB:
+            self._logged_shift = shift
+            self.log(f"🎚  Noise floor {floor:.1f} dBFS -> trig {self.eff_trig_db:.1f}  rel {self.eff_rel_db:.1f} dBFS "
+                  f"({shift:+.1f} dB)")
@@ -0,0 +1,78 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for sound recognition.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""Is the audio callback keeping up? Timing of every call against its deadline.
+
+The deadline of a callback is the block period (blocksize / samplerate,
+21.3 ms for 1024 frames at 48 kHz): if processing a block takes longer,
+the next one is already waiting and PortAudio eventually overflows.
+wrap() times each call into a ring of recent costs and counts
+  over budget - calls whose processing took longer than the block period
+  late        - calls that arrived more than LATE_FACTOR periods after the previous one
+  status flags - input_overflow / input_underflow as reported by PortAudio
+The bookkeeping is a few float operations per call; percentiles are only
+computed by format_summary().
+"""
+
+import time
+
+import numpy as np
+
+
+class CallbackDeadlineMonitor:
+    """Per-call cost and arrival timing of an audio callback."""
+
+    LATE_FACTOR = 1.5
+    RING = 2048
+    FLAGS = ("input_overflow", "input_underflow")
+
+    def __init__(self, samplerate, blocksize):
+        self.period_ms = blocksize / float(samplerate) * 1000.0
+        self._costs = np.zeros(self.RING)
+        self.calls = 0
+        self.cost_ms_max = 0.0
+        self.over_budget = 0
+        self.late = 0
+        self.gap_ms_max = 0.0
+        self.flags = dict.fromkeys(self.FLAGS, 0)
+        self._t_prev = None
+
+    def wrap(self, callback):
+        """callback with the same signature, timed."""
+        def timed(indata, frames, time_info, status):
+            t0 = time.perf_counter()
+            try:
+                callback(indata, frames, time_info, status)
+            finally:
+                self.record(t0, time.perf_counter(), status)
+        return timed
+
+    def record(self, t0, t1, status=None):
+        cost_ms = (t1 - t0) * 1000.0
+        self._costs[self.calls % self.RING] = cost_ms
+        self.calls += 1
+        if cost_ms > self.cost_ms_max:
+            self.cost_ms_max = cost_ms
+        if cost_ms > self.period_ms:
+            self.over_budget += 1
+        if self._t_prev is not None:
+            gap_ms = (t0 - self._t_prev) * 1000.0
+            if gap_ms > self.gap_ms_max:
+                self.gap_ms_max = gap_ms
+            if gap_ms > self.LATE_FACTOR * self.period_ms:
+                self.late += 1
+        self._t_prev = t0
+        if status:
+            for flag in self.FLAGS:
+                if getattr(status, flag, False):
+                    self.flags[flag] += 1
+
+    def format_summary(self):
+        recent = self._costs[:min(self.calls, self.RING)]
+        p50, p99 = np.percentile(recent, (50, 99)) if len(recent) else (0.0, 0.0)
+        return (f"Audio callback: {self.calls} calls, cost p50 {p50 * 1000:.0f} / p99 {p99 * 1000:.0f} / "
+                f"max {self.cost_ms_max * 1000:.0f} µs of a {self.period_ms:.1f} ms deadline "
+                f"(p99 {100.0 * p99 / self.period_ms:.1f} %); {self.over_budget} over budget, "
+                f"{self.late} late (max gap {self.gap_ms_max:.1f} ms), "
+                f"overflow {self.flags['input_overflow']}, underflow {self.flags['input_underflow']}")
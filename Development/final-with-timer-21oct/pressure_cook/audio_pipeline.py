@@ -0,0 +1,239 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for sound recognition.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""Microphone -> loudness/VAD/TDOA pipeline, built from the monitor's options.
+
+AudioPipeline runs in the monitor process (default) or inside the audio
+process (--audio-process, see audio_proc.py); either way the vision loop
+only sees AudioSnapshot records from read().
+"""
+
+import queue
+import threading
+import time
+
+from . import backends, calibration
+from .audio import BLOCKSIZE, DEVICE_CACHE_PATH, HP_CUTOFF, LoudnessMonitor, resolve_input_device
+from .audio_deadline import CallbackDeadlineMonitor
+from .config import DEFAULT_REL_DB, DEFAULT_TRIG_DB
+from .level_history import LevelHistory
+from .level_stats import AcousticStats
+from .localize import TdoaLocalizer
+from .vad import SpectralVad
+
+# Horizons of the streaming room statistics; "task" is closed by new_task(), "session" never
+ACOUSTIC_HORIZONS = (("minute", 60.0), ("task", None), ("session", None))
+
+
+class AudioSnapshot:
+    """What the vision loop needs from the audio side, for one frame."""
+    __slots__ = ("t", "avg_db", "volume_loud", "trig_db", "rel_db", "floor_db", "voice_active",
+                 "loud_station", "located_station", "bearing", "features", "channel_avg_db", "acoustics")
+
+    def __init__(self, t=0.0, avg_db=-120.0, volume_loud=False, trig_db=0.0, rel_db=0.0, floor_db=None,
+                 voice_active=None, loud_station=None, located_station=None, bearing=None, features=None,
+                 channel_avg_db=(), acoustics=None):
+        self.t = t
+        self.avg_db = avg_db
+        self.volume_loud = volume_loud
+        self.trig_db = trig_db
+        self.rel_db = rel_db
+        self.floor_db = floor_db
+        self.voice_active = voice_active
+        self.loud_station = loud_station
+        self.located_station = located_station
+        self.bearing = bearing
+        self.features = features
+        self.channel_avg_db = channel_avg_db
+        self.acoustics = acoustics    # {horizon: (Leq, L10, L50, L90)} of the open windows
+
+
+class AudioPipeline:
+    """Audio source plus LoudnessMonitor with the optional stages the options ask for."""
+
+    def __init__(self, args, stations):
+        self.args = args
+        self.stations = stations
+        self.source = None
+        self.loudness = None
+        self.vad = None
+        self.localizer = None
+        self.profile = None
+        self.acoustics = None
+        self.history = None
+        self.deadline = None
+        self._running = False
+        self.trig_db = args.trig_db
+        self.rel_db = args.rel_db
+        self.task_mark = 0    # bumped by new_task(); the audio thread rolls the "task" window
+        self._task_seen = 0
+        self._log = queue.SimpleQueue()    # lines from the audio callback, printed by _printer
+        self._printer_thread = None
+
+    def open(self):
+        args = self.args
+        in_dev = resolve_input_device(args.in_dev, args.in_name, cache_path=DEVICE_CACHE_PATH) \
+            if args.audio == "sounddevice" else None
+        self.source = backends.make_audio_source(args.audio, device=in_dev, samplerate=args.sr,
+                                                 channels=args.channels or None, blocksize=BLOCKSIZE)
+        hp_cutoff = self._apply_profile()
+        decimate = int(self.source.samplerate // args.decimate_to) if args.decimate_to else 1
+        if decimate > 1:
+            # Whole output samples per block keep every analysed block the same length
+            self.source.blocksize = BLOCKSIZE // decimate * decimate
+        sr, bs = self.source.samplerate / decimate, self.source.blocksize // decimate
+        if args.localize and args.in_ch is None and self.source.channels > max(self.stations.mic_pair):
+            self.localizer = TdoaLocalizer(sr, bs, self.stations.mic_pair,
+                                           self.stations.mic_spacing, self.stations.sound_bearings).start()
+        self.vad = SpectralVad(bs / sr, smooth_sec=args.hold_sec) if args.vad else None
+        self.loudness = LoudnessMonitor(self.source.samplerate, self.trig_db, self.rel_db,
+                                        args.hold_sec, hp_cutoff=hp_cutoff, in_channel=args.in_ch,
+                                        print_audio=args.print_audio, blocksize=self.source.blocksize,
+                                        adaptive=args.adaptive, adapt_range_db=args.adapt_range,
+                                        adapt_tau_sec=args.adapt_tau,
+                                        base_floor_db=self.profile.get("noise_floor_db") if self.profile else None,
+                                        vad=self.vad, channel_stations=self.stations.mic_channels,
+                                        localizer=self.localizer, decimate=decimate,
+                                        log=self._log.put)
+        self.acoustics = AcousticStats(bs / sr, ACOUSTIC_HORIZONS, on_complete=self._log_levels)
+        self.history = LevelHistory(bs / sr)
+        return self
+
+    def start(self, callback=None):
+        """Start the stream; `callback` (if any) runs after each analysed block."""
+        def cb(indata, frames, time_info, status):
+            self.loudness.callback(indata, frames, time_info, status)
+            if self.task_mark != self._task_seen:
+                self._task_seen = self.task_mark
+                self.acoustics.roll("task")
+            f = self.loudness.features
+            self.acoustics.add(f.rms_db)
+            self.history.add(f.t, f.rms_db)
+            if callback is not None:
+                callback(self)
+        self.deadline = CallbackDeadlineMonitor(self.source.samplerate, self.source.blocksize)
+        self._running = True
+        self._printer_thread = threading.Thread(target=self._printer, daemon=True)
+        self._printer_thread.start()
+        self.source.start(self.deadline.wrap(cb))
+        if self.args.audio_report:
+            threading.Thread(target=self._reporter, daemon=True).start()
+        return self
+
+    def _reporter(self):
+        """Print the callback deadline summary every --audio-report seconds."""
+        while True:
+            time.sleep(self.args.audio_report)
+            if not self._running:
+                return
+            print(self.deadline.format_summary())
+
+    def new_task(self):
+        """Start a new per-task statistics window (called by the monitor at each rotation)."""
+        self.task_mark += 1
+
+    def _printer(self):
+        """Print what the audio callback logged; None ends the thread."""
+        while True:
+            line = self._log.get()
+            if line is None:
+                return
+            print(line)
+
+    def _log_levels(self, name, levels, seconds):
+        # Runs in the audio callback: only queue the line, _printer does the I/O
+        if name != "minute" or self.args.print_audio:
+            self._log.put(f"📊 Room level, {name} ({seconds:.0f} s): {AcousticStats.format_levels(levels)} dBFS")
+
+    def _apply_profile(self):
+        """Fill in thresholds not given on the command line from the device's saved profile.
+        Returns the high-pass cutoff to use (the one the profile was measured with)."""
+        if not self.args.no_profile and (self.trig_db is None or self.rel_db is None):
+            self.profile = calibration.find_profile(self.source.device_name, self.args.profiles)
+        hp_cutoff = HP_CUTOFF
+        if self.profile is not None:
+            if self.trig_db is None:
+                self.trig_db = self.profile["trig_db"]
+            if self.rel_db is None:
+                self.rel_db = self.profile["rel_db"]
+            hp_cutoff = self.profile.get("hp_cutoff", HP_CUTOFF)
+        if self.trig_db is None:
+            self.trig_db = DEFAULT_TRIG_DB
+        if self.rel_db is None:
+            self.rel_db = DEFAULT_REL_DB
+        return hp_cutoff
+
+    def read(self, now=None):
+        lm = self.loudness
+        located, bearing = self.localizer.recent(now) if self.localizer is not None else (None, None)
+        return AudioSnapshot(
+            t=lm.features.t, avg_db=lm.last_avg_db, volume_loud=lm.volume_loud,
+            trig_db=lm.eff_trig_db, rel_db=lm.eff_rel_db,
+            floor_db=lm.floor.floor_db if lm.floor is not None else None,
+            voice_active=self.vad.voice_active if self.vad is not None else None,
+            loud_station=lm.loud_station, located_station=located, bearing=bearing,
+            features=lm.features, channel_avg_db=tuple(lm.channel_avg_db), acoustics=self.acoustics.current)
+
+    def describe(self):
+        """Startup report lines."""
+        args, src, lm = self.args, self.source, self.loudness
+        lines = [f"🎤 Using input device: {src.device_name} @ {src.samplerate} Hz, {src.channels} channel(s)"]
+        if args.in_ch is None and src.channels > 1:
+            mics = [f"ch{ch}→{st}" for ch, st in sorted(self.stations.mic_channels.items()) if ch < src.channels]
+            lines.append(f"🎤 Mics: {', '.join(mics) or 'no channel mapped to a station'}")
+        if lm.decimator is not None:
+            d = lm.decimator
+            lines.append(f"🎤 Decimating ×{d.factor} to {lm.samplerate:g} Hz "
+                         f"({d.taps}-tap anti-alias FIR, +{d.delay_samples / src.samplerate * 1000:.2f} ms)")
+        elif args.decimate_to:
+            lines.append(f"⚠ --decimate-to {args.decimate_to} needs a device rate at least twice that; not decimating")
+        if args.localize:
+            if self.localizer is not None:
+                a, b = self.stations.mic_pair
+                lines.append(f"🧭 Localizing on ch{a}/ch{b}, {self.stations.mic_spacing:g} m apart")
+            else:
+                lines.append(f"⚠ --localize needs mic channels {self.stations.mic_pair} (got {src.channels})")
+        if self.profile is not None:
+            p = self.profile
+            lines.append(f"📁 Calibration profile from {p.get('calibrated_at', '?')}: "
+                         f"trig {self.trig_db:.1f}  rel {self.rel_db:.1f} dBFS (HPF {p.get('hp_cutoff', HP_CUTOFF):g} Hz)")
+            if p.get("samplerate") and p["samplerate"] != src.samplerate:
+                lines.append(f"⚠ Profile was measured at {p['samplerate']} Hz, stream runs at "
+                             f"{src.samplerate} Hz; re-run sound-calibrate.py if alerts misfire")
+        elif args.trig_db is None or args.rel_db is None:
+            lines.append(f"⚠ No calibration profile for \"{src.device_name}\"; "
+                         f"using trig {self.trig_db:.1f}  rel {self.rel_db:.1f} dBFS")
+        if args.adaptive:
+            base = lm.base_floor_db
+            lines.append(f"🎚  Adaptive thresholds: ±{args.adapt_range:g} dB around trig {self.trig_db:.1f}  "
+                         f"rel {self.rel_db:.1f}, floor " + (f"{base:.1f} dBFS (profile)" if base is not None
+                                                             else f"measured over the first {LoudnessMonitor.ADAPT_WARMUP_SEC:g} s"))
+        return lines
+
+    def summary(self):
+        """Exit report lines."""
+        lines = [self.loudness.extractor.format_summary()] if self.loudness is not None else []
+        if self.deadline is not None:
+            lines.append(self.deadline.format_summary())
+        if self.source is not None and self.source.format_summary() is not None:
+            lines.append(self.source.format_summary())
+        if self.acoustics is not None:
+            lines.append(f"📊 Room level, session: {AcousticStats.format_levels(self.acoustics.levels('session'))} dBFS")
+        if self.localizer is not None:
+            lines.append(self.localizer.format_summary())
+        return lines
+
+    def stop(self):
+        lines = []
+        self._running = False
+        if self.source is not None:
+            self.source.stop()
+            if self.args.save_levels:
+                self.history.save(self.args.save_levels)
+                lines.append(f"📁 Level history saved to {self.args.save_levels}")
+        if self._printer_thread is not None:
+            self._log.put(None)    # after the last callback: print what it queued, then end
+            self._printer_thread.join(timeout=1.0)
+        return self.summary() + lines
+
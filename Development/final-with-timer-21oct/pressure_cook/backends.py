@@ -0,0 +1,540 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for the hardware abstraction layer.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""Pluggable backends for the four pieces of hardware the monitor talks to.
+
+    FrameSource  - camera frames          (opencv | fake)
+    AudioSource  - microphone blocks      (sounddevice | fake)
+    LedSink      - the LED Arduino        (serial | fake)
+    SpeechSink   - spoken feedback        (say | espeak | fake)
+
+Real backends import their libraries lazily, so the fakes run on a Linux box
+with none of the Mac hardware (or even sounddevice) installed. Pick them with
+make_frame_source() / make_audio_source() / make_led_sink() / make_speech_sink().
+"""
+
+import shutil
+import subprocess
+import threading
+import time
+
+import numpy as np
+
+from . import protocol
+from .audio import find_input_by_name
+from .led_link import LedLink, find_arduino_port
+from .virtual_arduino import VirtualLedController
+
+FRAME_BACKENDS = ("opencv", "fake")
+AUDIO_BACKENDS = ("sounddevice", "fake")
+LED_BACKENDS = ("serial", "fake")
+SPEECH_BACKENDS = ("say", "espeak", "fake")
+
+
+# --- camera -----------------------------------------------------------------
+
+class FrameSource:
+    """Camera interface: open() once, read() -> (ok, BGR frame), release()."""
+    name = "frames"
+
+    def open(self):
+        return self
+
+    def read(self):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+
+class OpenCVFrameSource(FrameSource):
+    """cv2.VideoCapture; AVFoundation on macOS, the default backend elsewhere."""
+    name = "opencv"
+
+    def __init__(self, index=1, api=None):
+        self.index = index
+        self.api = api
+        self.cap = None
+
+    def open(self):
+        import cv2
+        api = self.api
+        if api is None:
+            api = getattr(cv2, "CAP_AVFOUNDATION", cv2.CAP_ANY)
+        self.cap = cv2.VideoCapture(self.index, api)
+        if not self.cap.isOpened():
+            self.cap = cv2.VideoCapture(self.index, cv2.CAP_ANY)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Could not open camera {self.index}")
+        return self
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+
+class FakeFrameSource(FrameSource):
+    """Synthetic frames with ArUco markers drawn at given positions.
+
+    markers maps marker id -> (x, y) centre. Every `wander_period` seconds
+    marker `wander_id` is drawn at `wander_to` for `wander_secs`, so the
+    marker-out path gets exercised. `wander_to` must be in frame and
+    outside every station; undetected() checks the detector finds each
+    marker in both layouts.
+    """
+    name = "fake"
+
+    def __init__(self, size=(1920, 1080), markers=None, fps=30.0, marker_px=80,
+                 wander_id=1, wander_to=(960, 100), wander_period=30.0, wander_secs=8.0):
+        self.size = size
+        self.markers = dict(markers or {})
+        self.fps = fps
+        self.marker_px = marker_px
+        self.wander_id = wander_id
+        self.wander_to = wander_to
+        self.wander_period = wander_period
+        self.wander_secs = wander_secs
+        self._images = {}
+        self._t0 = None
+        self._next = 0.0
+
+    def open(self):
+        import cv2
+        import cv2.aruco as aruco
+        d = aruco.getPredefinedDictionary(aruco.DICT_4X4_50)
+        for mid in self.markers:
+            if hasattr(aruco, "generateImageMarker"):
+                img = aruco.generateImageMarker(d, mid, self.marker_px)
+            else:
+                img = aruco.drawMarker(d, mid, self.marker_px)
+            img = cv2.copyMakeBorder(img, 10, 10, 10, 10, cv2.BORDER_CONSTANT, value=255)
+            self._images[mid] = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        self._t0 = time.perf_counter()
+        self._next = self._t0
+        return self
+
+    def render(self, out):
+        """One frame: every marker in its tray, or (out=True) the wandering one at wander_to."""
+        w, h = self.size
+        frame = np.full((h, w, 3), 90, np.uint8)
+        for mid, (cx, cy) in self.markers.items():
+            if out and mid == self.wander_id:
+                cx, cy = self.wander_to
+            img = self._images[mid]
+            s = img.shape[0]
+            x0 = int(min(max(0, cx - s // 2), w - s))
+            y0 = int(min(max(0, cy - s // 2), h - s))
+            frame[y0:y0 + s, x0:x0 + s] = img
+        return frame
+
+    def undetected(self, detect):
+        """[(marker id, "in tray" | "out")] drawn but not found by detect(frame) -> (corners, ids)."""
+        missing = []
+        for out, where in ((False, "in tray"), (True, "out")):
+            _, ids = detect(self.render(out))
+            found = set() if ids is None else set(ids.flatten().tolist())
+            missing += [(mid, where) for mid in self.markers if mid not in found]
+        return missing
+
+    def read(self):
+        # Pace like a real camera so the main loop isn't a busy spin
+        now = time.perf_counter()
+        if now < self._next:
+            time.sleep(self._next - now)
+        self._next = max(now, self._next) + 1.0 / self.fps
+
+        t = time.perf_counter() - self._t0
+        out = self.wander_period > 0 and (t % self.wander_period) >= self.wander_period - self.wander_secs
+        return True, self.render(out)
+
+
+def make_frame_source(kind, index=1, markers=None):
+    if kind == "opencv":
+        return OpenCVFrameSource(index)
+    if kind == "fake":
+        return FakeFrameSource(markers=markers)
+    raise ValueError(f"unknown camera backend {kind!r} (choose from {FRAME_BACKENDS})")
+
+
+# --- microphone -------------------------------------------------------------
+
+class AudioSource:
+    """Microphone interface.
+
+    start(callback) calls callback(indata, frames, time_info, status) from its
+    own thread, exactly like a sounddevice InputStream callback; indata is a
+    float32 array of shape (frames, channels).
+    """
+    name = "audio"
+    samplerate = 48000
+    channels = 1
+    blocksize = 1024
+    device_name = "unknown"
+
+    def start(self, callback):
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+    def format_summary(self):
+        return None
+
+
+class SoundDeviceAudioSource(AudioSource):
+    """PortAudio input via sounddevice. channels=None opens every input the device has.
+
+    A watchdog thread reopens the stream with the same parameters when it
+    stops on its own or no block has arrived for STALL_SEC (USB interface
+    unplugged, driver error), finding the device again by name since
+    PortAudio renumbers devices on hot-plug. (Status flags and callback
+    timing are counted by audio_deadline.CallbackDeadlineMonitor.)
+    """
+    name = "sounddevice"
+
+    STALL_SEC = 0.5
+    RETRY_SEC = 0.5
+
+    def __init__(self, device=None, samplerate=None, channels=None, blocksize=1024):
+        import sounddevice as sd
+        self._sd = sd
+        self.device = device
+        self.channels = channels or 1
+        self.blocksize = blocksize
+        self.samplerate = 48000
+        try:
+            info = sd.query_devices(device, "input") if device is not None else sd.query_devices(kind="input")
+            self.device_name = info.get("name", "unknown")
+            self.samplerate = int(samplerate or info["default_samplerate"])
+            self.channels = channels or max(1, int(info.get("max_input_channels", 1)))
+        except Exception:
+            if samplerate:
+                self.samplerate = int(samplerate)
+        self.stream = None
+        self._callback = None
+        self._running = False
+        self._last_block = 0.0
+        self.reopens = 0
+        self.lost_sec = 0.0
+        self._warned_rescan = False
+
+    def _on_block(self, indata, frames, time_info, status):
+        self._last_block = time.monotonic()
+        self._callback(indata, frames, time_info, status)
+
+    def _open(self):
+        self.stream = self._sd.InputStream(
+            samplerate=self.samplerate,
+            channels=self.channels,
+            blocksize=self.blocksize,
+            device=(self.device, None),
+            callback=self._on_block,
+            dtype="float32",
+        )
+        self.stream.start()
+        self._last_block = time.monotonic()
+
+    def start(self, callback):
+        self._callback = callback
+        self._running = True
+        self._open()
+        threading.Thread(target=self._watchdog, daemon=True).start()
+        return self
+
+    def _watchdog(self):
+        while self._running:
+            time.sleep(self.STALL_SEC / 2)
+            stream = self.stream
+            if not self._running or (stream is not None and stream.active
+                                     and time.monotonic() - self._last_block < self.STALL_SEC):
+                continue
+            self._reopen()
+
+    def _reopen(self):
+        t0 = time.monotonic()
+        print(f"⚠ Audio input \"{self.device_name}\" stopped; reopening…")
+        last_err = None
+        while self._running:
+            self._close()
+            try:
+                rescanned = self._restart_portaudio()
+                idx = find_input_by_name(self.device_name)
+                if idx is None and not rescanned:
+                    idx = self.device    # stale device list: try the same index again
+                if idx is not None:
+                    self.device = idx
+                    self._open()
+                    break
+            except Exception as e:
+                if str(e) != last_err:
+                    last_err = str(e)
+                    print(f"⚠ Audio input reopen failed: {e}")
+            time.sleep(self.RETRY_SEC)
+        if not self._running:
+            return
+        lost = time.monotonic() - t0
+        self.reopens += 1
+        self.lost_sec += lost
+        print(f"✅ Audio input back after {lost:.1f} s (device {self.device})")
+
+    def _restart_portaudio(self):
+        """Restart PortAudio so it sees devices plugged in since it was initialised; True if it was.
+
+        sounddevice has no public call for this. _terminate()/_initialize() are private
+        (present in sounddevice 0.3 to 0.5) and may change in any release; without them
+        the stream is just closed and reopened on the device list PortAudio started with.
+        """
+        terminate = getattr(self._sd, "_terminate", None)
+        initialize = getattr(self._sd, "_initialize", None)
+        if terminate is None or initialize is None:
+            if not self._warned_rescan:
+                self._warned_rescan = True
+                print("⚠ This sounddevice has no _terminate/_initialize; a re-plugged device "
+                      "that was renumbered will not be found until restart")
+            return False
+        terminate()
+        initialize()
+        return True
+
+    def _close(self):
+        stream, self.stream = self.stream, None
+        if stream is not None:
+            try:
+                stream.stop()
+                stream.close()
+            except Exception:
+                pass
+
+    def stop(self):
+        self._running = False
+        self._close()
+
+    def format_summary(self):
+        return f"Audio input: {self.reopens} reopen(s), {self.lost_sec:.1f} s lost"
+
+
+class FakeAudioSource(AudioSource):
+    """Noise at a scripted level, delivered in real time from a thread.
+
+    The room sits at `base_db` dBFS and gets a `loud_db` burst for
+    `loud_secs` every `loud_period` seconds. Bursts alternate between
+    voice-like (150 Hz harmonics with a formant and a syllable envelope) and
+    clatter (broadband noise), starting with voice. With several channels
+    (one mic per station) burst k is loudest on channel k % channels and
+    reaches the other mics 15 dB down and `delay_samples` later, so a TDOA
+    estimator can tell where it came from.
+    """
+    name = "fake"
+    device_name = "fake noise"
+
+    LEAK_DB = -15.0
+
+    def __init__(self, samplerate=48000, channels=1, blocksize=1024,
+                 base_db=-45.0, loud_db=-12.0, loud_period=25.0, loud_secs=4.0, seed=0,
+                 delay_samples=60):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.base_db = base_db
+        self.loud_db = loud_db
+        self.loud_period = loud_period
+        self.loud_secs = loud_secs
+        self._rng = np.random.default_rng(seed)
+        self.delay_samples = delay_samples
+        self._tail = np.zeros(delay_samples)
+        self._running = False
+
+    def level_at(self, t):
+        if self.loud_period > 0 and (t % self.loud_period) >= self.loud_period - self.loud_secs:
+            return self.loud_db
+        return self.base_db
+
+    def burst_channel_at(self, t):
+        return int(t // self.loud_period) % self.channels
+
+    def is_voice_at(self, t):
+        return self.level_at(t) != self.base_db and int(t // self.loud_period) % 2 == 0
+
+    def _voice(self, n):
+        """Unit-RMS voiced-speech stand-in for block n (phase continuous)."""
+        t = (n * self.blocksize + np.arange(self.blocksize)) / float(self.samplerate)
+        f0 = 150.0
+        # Harmonics shaped by a broad first formant around 500 Hz
+        x = sum(np.sin(2 * np.pi * f0 * h * t) / (1.0 + ((f0 * h - 500.0) / 400.0) ** 2)
+                for h in range(1, int(3400 / f0) + 1))
+        x *= 0.3 + 0.7 * np.abs(np.sin(2 * np.pi * 2.0 * t))
+        return x / (np.sqrt(np.mean(x ** 2)) + 1e-12)
+
+    def block(self, n):
+        """Block n of the scripted stream, (blocksize, channels) float32."""
+        t = n * self.blocksize / float(self.samplerate)
+        block = self._rng.standard_normal((self.blocksize, self.channels)) * 10.0 ** (self.base_db / 20.0)
+        level = self.level_at(t)
+        if level == self.base_db:
+            self._tail[:] = 0.0
+            return block.astype(np.float32)
+        src = self._voice(n) if self.is_voice_at(t) else self._rng.standard_normal(self.blocksize)
+        src *= 10.0 ** (level / 20.0)
+        near = self.burst_channel_at(t)
+        late = np.concatenate((self._tail, src))[:self.blocksize]
+        for c in range(self.channels):
+            block[:, c] += src if c == near else late * 10.0 ** (self.LEAK_DB / 20.0)
+        if self.delay_samples:
+            self._tail = src[-self.delay_samples:].copy()
+        return block.astype(np.float32)
+
+    def _run(self, callback):
+        dt = self.blocksize / float(self.samplerate)
+        t0 = time.perf_counter()
+        n = 0
+        while self._running:
+            block = self.block(n)
+            callback(block, self.blocksize, None, None)
+            n += 1
+            delay = t0 + n * dt - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def start(self, callback):
+        self._running = True
+        threading.Thread(target=self._run, args=(callback,), daemon=True).start()
+        return self
+
+    def stop(self):
+        self._running = False
+
+
+def make_audio_source(kind, device=None, samplerate=None, channels=None, blocksize=1024):
+    """channels=None: every input of the device (the fake has two, one per station)."""
+    if kind == "sounddevice":
+        return SoundDeviceAudioSource(device, samplerate, channels, blocksize)
+    if kind == "fake":
+        return FakeAudioSource(samplerate or 48000, channels or 2, blocksize)
+    raise ValueError(f"unknown audio backend {kind!r} (choose from {AUDIO_BACKENDS})")
+
+
+# --- LEDs -------------------------------------------------------------------
+# The LED sink interface is LedLink itself (set_state, animate,
+# configure_segments, update_segments, on_done, format_summary); the backends
+# only differ in what is on the other end of the "serial port".
+
+class LoopbackSerial:
+    """Serial-port stand-in that talks to a VirtualLedController in-process."""
+
+    def __init__(self, controller=None, timeout=0.05):
+        self.controller = controller or VirtualLedController()
+        self.timeout = timeout
+        self.port = "loopback"
+        self._rx = bytearray()
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        # The real board announces itself from setup()
+        info = bytes((protocol.VERSION,)) + self.controller.num_pixels.to_bytes(2, "little")
+        self._rx += protocol.encode_frame(0, protocol.OP_READY, info + bytes((protocol.MAX_SEGMENTS,)))
+
+    def _now(self):
+        return time.perf_counter() - self._t0
+
+    @property
+    def in_waiting(self):
+        return len(self._rx)
+
+    def write(self, data):
+        with self._lock:
+            self._rx += self.controller.feed(bytes(data), self._now())
+        return len(data)
+
+    def read(self, n=1):
+        deadline = time.perf_counter() + self.timeout
+        while True:
+            with self._lock:
+                self._rx += self.controller.tick(self._now())
+                if self._rx:
+                    out = bytes(self._rx[:n])
+                    del self._rx[:n]
+                    return out
+            if time.perf_counter() >= deadline:
+                return b""
+            time.sleep(0.002)
+
+    def close(self):
+        pass
+
+
+def make_led_sink(kind, port=None):
+    """LedLink wired to the real board (serial) or to an in-process virtual one (fake)."""
+    if kind == "serial":
+        import serial
+
+        def opener():
+            p = port or find_arduino_port()
+            if p is None:
+                raise serial.SerialException("Arduino not found")
+            return serial.Serial(p, protocol.BAUD_RATE, timeout=0.05)
+        return LedLink(opener=opener)
+    if kind == "fake":
+        return LedLink(opener=LoopbackSerial)
+    raise ValueError(f"unknown LED backend {kind!r} (choose from {LED_BACKENDS})")
+
+
+# --- speech -----------------------------------------------------------------
+
+class SpeechSink:
+    """speak(text) starts talking and returns a handle with poll() / terminate()
+    (the subset of subprocess.Popen the speech worker uses)."""
+    name = "speech"
+
+    def speak(self, text):
+        raise NotImplementedError
+
+
+class CommandSpeech(SpeechSink):
+    """Speech through a command-line TTS (macOS `say`, Linux `espeak`)."""
+
+    def __init__(self, name, argv):
+        self.name = name
+        self.argv = list(argv)
+
+    def speak(self, text):
+        return subprocess.Popen(self.argv + [str(text)])
+
+
+class _FakeUtterance:
+    def __init__(self, duration):
+        self._end = time.perf_counter() + duration
+
+    def poll(self):
+        return 0 if time.perf_counter() >= self._end else None
+
+    def terminate(self):
+        self._end = 0.0
+
+
+class FakeSpeech(SpeechSink):
+    """Prints the message and 'talks' for roughly as long as a voice would."""
+    name = "fake"
+
+    def __init__(self, wpm=170, log=print):
+        self.wpm = wpm
+        self.log = log
+
+    def speak(self, text):
+        words = max(1, len(str(text).split()))
+        if self.log:
+            self.log(f"🗣  {text}")
+        return _FakeUtterance(words * 60.0 / self.wpm)
+
+
+def make_speech_sink(kind, voice="Samantha", rate=170):
+    if kind == "say":
+        return CommandSpeech("say", ["/usr/bin/say", "-v", str(voice), "-r", str(rate)])
+    if kind == "espeak":
+        exe = shutil.which("espeak-ng") or shutil.which("espeak") or "espeak"
+        return CommandSpeech("espeak", [exe, "-s", str(rate)])
+    if kind == "fake":
+        return FakeSpeech(wpm=rate)
+    raise ValueError(f"unknown speech backend {kind!r} (choose from {SPEECH_BACKENDS})")
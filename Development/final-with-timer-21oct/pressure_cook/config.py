@@ -0,0 +1,106 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for the command line options.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""Command line options for the monitor (parsed once, in main())."""
+
+import argparse
+
+from . import backends, calibration
+
+# Used when neither the command line nor a saved profile gives thresholds
+DEFAULT_TRIG_DB = -28.0
+DEFAULT_REL_DB = -32.0
+
+
+def build_arg_parser():
+    ap = argparse.ArgumentParser(description="Pressure Cook station monitor")
+    # Audio device selection
+    ap.add_argument("--in", dest="in_dev", type=int, default=None,
+                    help="Input device index (e.g., your FastTrack)")
+    ap.add_argument("--in-name", dest="in_name", type=str, default=None,
+                    help='Match input device by name substring (e.g., "Fast Track", "FastTrack", "M-Audio")')
+    ap.add_argument("--sr", dest="sr", type=int, default=None,
+                    help="Sample rate. If not set, use device default.")
+    ap.add_argument("--in-channel", dest="in_ch", type=int, default=None,
+                    help="Only analyse this channel (0=Left, 1=Right). Default: every channel, "
+                         "mapped to stations by \"mic_channels\" in config/zones.json")
+    ap.add_argument("--channels", type=int, default=0,
+                    help="Number of input channels to capture (0 = all the device has)")
+    ap.add_argument("--trig-db", dest="trig_db", type=float, default=None,
+                    help=f"Trigger threshold in dBFS (avg >= trig -> loud); default from the device's "
+                         f"calibration profile, else {DEFAULT_TRIG_DB}")
+    ap.add_argument("--rel-db", dest="rel_db", type=float, default=None,
+                    help=f"Release threshold in dBFS (avg <= rel -> quiet); default from the device's "
+                         f"calibration profile, else {DEFAULT_REL_DB}")
+    ap.add_argument("--profiles", default=calibration.PROFILES_PATH,
+                    help="Calibration profiles written by sound-calibrate.py")
+    ap.add_argument("--no-profile", action="store_true",
+                    help="Ignore saved calibration profiles")
+    ap.add_argument("--hold-sec", dest="hold_sec", type=float, default=0.8,
+                    help="How long the avg must stay loud to trigger (seconds)")
+    ap.add_argument("--adaptive", action="store_true",
+                    help="Move trigger/release with the room's background level (extractor fans, ovens)")
+    ap.add_argument("--adapt-range", dest="adapt_range", type=float, default=6.0,
+                    help="Max dB the adaptive thresholds may move away from the calibrated ones")
+    ap.add_argument("--adapt-tau", dest="adapt_tau", type=float, default=30.0,
+                    help="Time constant (s) of the noise floor tracker when the room gets louder")
+    ap.add_argument("--vad", action="store_true",
+                    help="Only count loudness as too loud when it sounds like people talking "
+                         "(spectral voice-activity detection), not clatter or fans")
+    ap.add_argument("--localize", action="store_true",
+                    help="Locate loud sounds by time difference of arrival across the mic pair in "
+                         "\"mic_array\" (config/zones.json) and name the station in the alert")
+    ap.add_argument("--decimate-to", dest="decimate_to", type=int, default=0,
+                    help="Downsample the microphone to about this rate (e.g. 16000) before any "
+                         "analysis; 0 = analyse at the device rate")
+    ap.add_argument("--save-levels", dest="save_levels", default=None, metavar="PATH",
+                    help="At exit, save the level history (per block for the last minute, per second for "
+                         "the last hour, per minute for the session) to this .npz file")
+    ap.add_argument("--audio-process", dest="audio_process", action="store_true",
+                    help="Run audio capture and analysis in a separate process that shares its latest "
+                         "state through shared memory, so the camera loop and the audio can't stall each other")
+    ap.add_argument("--audio-report", dest="audio_report", type=float, default=60.0, metavar="SEC",
+                    help="Every SEC seconds print how long the audio callback takes against its block "
+                         "deadline, late calls and overflow/underflow counts (0 = only at exit)")
+    ap.add_argument("--print-audio", action="store_true",
+                    help="Print avg dBFS and state to console once per ring")
+    # Frame profiler
+    ap.add_argument("--profile-overlay", dest="profile_overlay", action="store_true",
+                    help="Show per-stage frame timings (p50/p95/p99 ms) and fps on the preview")
+    ap.add_argument("--profile-out", dest="profile_out", default=None, metavar="PATH",
+                    help="At exit, write the per-stage frame timings to PATH (.json, else CSV)")
+    ap.add_argument("--trace-out", dest="trace_out", default=None, metavar="PATH",
+                    help="At exit, write every alert's latency trace (capture -> detection -> arbitration "
+                         "-> serial write -> LED ack -> speech start) to PATH as JSON lines")
+    # Arduino
+    ap.add_argument("--serial-port", dest="serial_port", type=str, default=None,
+                    help="Arduino serial port; found by USB VID/PID if not set (or a virtual one, "
+                         "see pressure_cook/virtual_arduino.py)")
+    ap.add_argument("--print-serial", action="store_true",
+                    help="Print LED command round-trip latency every 10 s")
+    # Backends
+    ap.add_argument("--camera", choices=backends.FRAME_BACKENDS, default="opencv",
+                    help="Frame source backend (fake = synthetic frames with markers)")
+    ap.add_argument("--camera-index", dest="camera_index", type=int, default=1,
+                    help="Camera index for the opencv backend")
+    ap.add_argument("--audio", choices=backends.AUDIO_BACKENDS, default="sounddevice",
+                    help="Audio source backend (fake = scripted noise)")
+    ap.add_argument("--leds", choices=backends.LED_BACKENDS, default="serial",
+                    help="LED sink backend (fake = in-process virtual Arduino)")
+    ap.add_argument("--speech", choices=backends.SPEECH_BACKENDS, default="say",
+                    help="Speech backend (say = macOS, espeak = Linux, fake = print)")
+    ap.add_argument("--headless", action="store_true",
+                    help="Don't open the preview window (stop with Ctrl+C)")
+    # Voice settings
+    ap.add_argument("--voice",
+                    default="Samantha",
+                    choices=["Samantha"],
+                    help="macOS say voice: Samantha")
+    ap.add_argument("--rate", type=int, default=170, help="Speaking rate (wpm), typically 150–210.")
+    return ap
+
+
+def parse_args(argv=None):
+    args, _ = build_arg_parser().parse_known_args(argv)
+    return args
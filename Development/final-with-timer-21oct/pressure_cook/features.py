@@ -0,0 +1,144 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for sound recognition.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""Per-block audio features, computed once and shared by every consumer.
+
+FeatureExtractor.compute() makes one vectorized pass over a (high-passed)
+mono block and fills a BlockFeatures record: level (RMS/peak dBFS, crest
+factor), zero-crossing rate and, from one windowed FFT, spectral centroid,
+speech-band ratio and spectral flatness. The loudness detector, the VAD,
+the --print-audio log and the overlay all read the same record.
+"""
+
+import math
+import time
+
+import numpy as np
+
+SPEECH_BAND = (300.0, 3400.0)
+_EPS = 1e-12
+
+
+class BlockFeatures:
+    """Feature record for one audio block."""
+    __slots__ = ("t", "rms_db", "peak_db", "crest_db", "zcr", "centroid_hz", "speech_ratio", "flatness")
+
+    def __init__(self, t=0.0, rms_db=-120.0, peak_db=-120.0, crest_db=0.0, zcr=0.0,
+                 centroid_hz=0.0, speech_ratio=0.0, flatness=1.0):
+        self.t = t
+        self.rms_db = rms_db
+        self.peak_db = peak_db
+        self.crest_db = crest_db
+        self.zcr = zcr
+        self.centroid_hz = centroid_hz
+        self.speech_ratio = speech_ratio
+        self.flatness = flatness
+
+    def as_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __repr__(self):
+        return (f"BlockFeatures(rms={self.rms_db:.1f} dB, peak={self.peak_db:.1f} dB, crest={self.crest_db:.1f} dB, "
+                f"zcr={self.zcr:.3f}, centroid={self.centroid_hz:.0f} Hz, "
+                f"speech={self.speech_ratio:.2f}, flat={self.flatness:.2f})")
+
+
+class FeatureExtractor:
+    """Computes BlockFeatures for fixed-size blocks; work buffers are allocated once.
+
+    compute() is timed. If its running average goes over `budget_frac` of
+    the block duration, the spectral part (the expensive one) is only
+    redone every 2nd, then 4th block, and the last spectral values are
+    carried over in between; it steps back once well under budget. That
+    change is reported through `log` (print by default), which the monitor
+    points at its log queue so the audio callback never prints.
+    """
+
+    MAX_STRIDE = 4
+
+    def __init__(self, samplerate, blocksize=1024, band=SPEECH_BAND, budget_frac=0.1, log=print):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.log = log
+
+        self._abs = np.empty(blocksize, np.float32)
+        self._sign = np.empty(blocksize, bool)
+        self._window = np.hanning(blocksize).astype(np.float32)
+        self._xw = np.zeros(blocksize, np.float32)
+        self._power = np.empty(blocksize // 2 + 1, np.float64)
+        self._freqs = np.fft.rfftfreq(blocksize, 1.0 / samplerate)
+        self._lo = int(np.searchsorted(self._freqs, band[0]))
+        self._hi = int(np.searchsorted(self._freqs, band[1], side="right"))
+        self._logbuf = np.empty(self._hi - self._lo, np.float64)
+
+        self.block_sec = blocksize / float(samplerate)
+        self.budget_ms = budget_frac * self.block_sec * 1000.0
+        self.spectral_stride = 1
+        self.cost_ms_avg = 0.0
+        self.cost_ms_max = 0.0
+        self.blocks = 0
+        self.last = BlockFeatures()
+
+    def compute(self, x, t=None):
+        """Features of one mono block (float32/64 1-D array)."""
+        t0 = time.perf_counter()
+        self.blocks += 1
+        n = min(len(x), self.blocksize)
+        x = x[:n]
+
+        # Level: RMS, peak, crest factor
+        ms = float(np.dot(x, x)) / max(n, 1)
+        np.abs(x, out=self._abs[:n])
+        peak = float(self._abs[:n].max()) if n else 0.0
+        rms_db = 10.0 * math.log10(ms + _EPS)
+        peak_db = 20.0 * math.log10(peak + _EPS)
+
+        # Zero-crossing rate (fraction of sample pairs that change sign)
+        sign = self._sign[:n]
+        np.signbit(x, out=sign)
+        zcr = float(np.count_nonzero(sign[1:] != sign[:-1])) / max(n - 1, 1)
+
+        f = BlockFeatures(time.time() if t is None else t, rms_db, peak_db, peak_db - rms_db, zcr,
+                          self.last.centroid_hz, self.last.speech_ratio, self.last.flatness)
+        if self.blocks % self.spectral_stride == 0:
+            self._spectral(x, f)
+
+        self.last = f
+        self._account((time.perf_counter() - t0) * 1000.0)
+        return f
+
+    def _spectral(self, x, f):
+        n = len(x)
+        np.multiply(x, self._window[:n], out=self._xw[:n])
+        if n < self.blocksize:
+            self._xw[n:] = 0.0
+        np.abs(np.fft.rfft(self._xw), out=self._power)
+        np.square(self._power, out=self._power)
+
+        p = self._power[1:]                                  # skip DC
+        total = float(p.sum()) + _EPS
+        f.centroid_hz = float(np.dot(self._freqs[1:], p)) / total
+        band = self._power[self._lo:self._hi]
+        band_e = float(band.sum())
+        f.speech_ratio = band_e / total
+        np.maximum(band, 1e-20, out=self._logbuf)
+        np.log(self._logbuf, out=self._logbuf)
+        f.flatness = math.exp(float(self._logbuf.mean())) / (band_e / len(band) + 1e-20)
+
+    def _account(self, cost_ms):
+        if self.blocks == 1:
+            self.cost_ms_avg = cost_ms
+        else:
+            self.cost_ms_avg += 0.05 * (cost_ms - self.cost_ms_avg)
+        self.cost_ms_max = max(self.cost_ms_max, cost_ms)
+        if self.cost_ms_avg > self.budget_ms and self.spectral_stride < self.MAX_STRIDE:
+            self.spectral_stride *= 2
+            self.log(f"⚠ Audio features {self.cost_ms_avg:.2f} ms/block are over the {self.budget_ms:.2f} ms budget; "
+                  f"spectrum every {self.spectral_stride} blocks")
+        elif self.cost_ms_avg < self.budget_ms / 4 and self.spectral_stride > 1:
+            self.spectral_stride //= 2
+
+    def format_summary(self):
+        return (f"Audio features: {self.cost_ms_avg * 1000:.0f} µs/block avg, {self.cost_ms_max * 1000:.0f} µs max "
+                f"(budget {self.budget_ms * 1000:.0f} µs), spectrum every {self.spectral_stride} block(s)")
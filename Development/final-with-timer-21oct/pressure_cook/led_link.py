@@ -0,0 +1,405 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for the Arduino serial link.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""Serial link to the LED Arduino: discovery, READY handshake, sequenced frames,
+ACK tracking, round-trip timing and hot reconnect."""
+
+import threading
+import time
+from collections import deque
+
+from . import protocol
+from .tracing import hop
+
+# USB vendor/product ids of boards we have used (None = any product)
+ARDUINO_USB_IDS = [
+    (0x2341, None),     # Arduino LLC (Uno 0043/0001, Nano Every, ...)
+    (0x2A03, None),     # Arduino SRL
+    (0x1A86, 0x7523),   # CH340 clones (cheap Nanos)
+]
+
+
+def find_arduino_port():
+    """Find the Arduino's serial port by USB VID/PID; None if not plugged in."""
+    from serial.tools import list_ports
+    ports = list(list_ports.comports())
+    for port in ports:
+        for vid, pid in ARDUINO_USB_IDS:
+            if port.vid == vid and (pid is None or port.pid == pid):
+                return port.device
+    for port in ports:
+        if "arduino" in (port.description or "").lower():
+            return port.device
+    return None
+
+
+def list_serial_ports():
+    """Human-readable list of serial ports for error messages."""
+    from serial.tools import list_ports
+    return [f"{p.device}: {p.description} [{p.hwid}]" for p in list_ports.comports()]
+
+
+class LedLink:
+    """Send framed commands to the Arduino and match its ACKs.
+
+    Every command gets a sequence number. A background reader thread decodes
+    replies, records the command round-trip time and resends commands that
+    were not acknowledged within `ack_timeout`.
+
+    With an `opener` (a callable returning an open serial port) the link can
+    connect() itself, waiting for the firmware's READY frame instead of a
+    fixed sleep, and reconnects after a USB glitch, replaying the segment
+    layout, the current strip state and the segment looks.
+    """
+
+    def __init__(self, ser=None, ack_timeout=0.25, retries=2, rtt_window=200, on_done=None,
+                 opener=None, reconnect_interval=1.0):
+        self.ser = ser
+        self.opener = opener
+        self.reconnect_interval = reconnect_interval
+        self.on_done = on_done          # called as on_done(seq, fallback) from the reader thread
+        self.ack_timeout = ack_timeout
+        self.retries = retries
+        self.parser = protocol.FrameParser()
+        self.rtt = deque(maxlen=rtt_window)
+        self.acked_state = None
+        self.connected = ser is not None
+        self.device_info = None         # from READY: {"version", "pixels", "max_segments"}
+        self.handshake_time = None
+        self.reconnects = 0
+        self.sent = 0
+        self.resent = 0
+        self.failed = 0
+        self.nacks = 0
+        self.device_loop_hz = None      # from the Arduino's OP_STATS telemetry
+        self.device_show_hz = None
+        self._seq = 0
+        self._pending = {}          # seq -> [frame_bytes, t_sent, tries, state, segments]
+        self._programs = {}         # ANIMATE seq -> (expected end, fallback state)
+        self._last_state_cmd = None  # (op, payload, state) to replay after a reconnect
+        self.segment_ranges = []
+        self._segments_sent = {}    # seg -> look last sent (see protocol.seg_entry)
+        self._segment_looks = {}    # seg -> look last requested
+        self.segment_entries_sent = 0
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._running = False
+
+    # --- connection -----------------------------------------------------
+
+    def connect(self, timeout=5.0):
+        """Open the port via `opener` and wait for the firmware to be ready.
+
+        Returns the seconds spent waiting; raises TimeoutError if the board
+        never answered.
+        """
+        self.ser = self.opener()
+        elapsed = self._handshake(timeout)
+        if elapsed is None:
+            self._close()
+            raise TimeoutError(f"Arduino did not answer within {timeout:.1f} s")
+        return elapsed
+
+    def _handshake(self, timeout):
+        """Wait for READY (sent from setup() after the reset on open) or an ACK to our PINGs."""
+        self._ready.clear()
+        t0 = time.perf_counter()
+        next_ping = t0 + 0.25       # give the bootloader a moment before poking it
+        while time.perf_counter() - t0 < timeout:
+            now = time.perf_counter()
+            if now >= next_ping:
+                self._write_raw(protocol.encode_frame(0, protocol.OP_PING))
+                next_ping = now + 0.25
+            data = self.ser.read(self.ser.in_waiting or 1)
+            if data:
+                for frame in self.parser.feed(data):
+                    if frame.op == protocol.OP_READY:
+                        self.device_info = protocol.decode_ready(frame.payload)
+                        self._ready.set()
+                    elif frame.op == protocol.OP_ACK and frame.seq == 0:
+                        self._ready.set()
+                    else:
+                        self._handle(frame)
+            if self._ready.is_set():
+                self.connected = True
+                self.handshake_time = time.perf_counter() - t0
+                return self.handshake_time
+        return None
+
+    def _close(self):
+        self.connected = False
+        try:
+            self.ser.close()
+        except Exception:
+            pass
+
+    def _reconnect(self):
+        """Reopen the port until the board answers, then replay the LED state."""
+        self._close()
+        with self._lock:
+            self._pending.clear()
+        while self._running:
+            time.sleep(self.reconnect_interval)
+            try:
+                self.ser = self.opener()
+                if self._handshake(timeout=3.0) is None:
+                    self._close()
+                    continue
+            except Exception:
+                continue
+            self.reconnects += 1
+            self._replay()
+            return
+
+    def _replay(self):
+        if self.segment_ranges:
+            self.send(protocol.OP_SEG_CONFIG, protocol.seg_config_payload(self.segment_ranges))
+        if self._last_state_cmd is not None:
+            op, payload, state = self._last_state_cmd
+            self.send(op, payload, state=state)
+        with self._lock:
+            self._segments_sent = {}
+            looks = dict(self._segment_looks)
+        self.update_segments(looks)
+
+    def start(self):
+        """Start the background reader thread."""
+        self._running = True
+        threading.Thread(target=self._reader, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._running = False
+
+    # --- sending ----------------------------------------------------------
+
+    def _next_seq(self):
+        self._seq = (self._seq % 255) + 1     # seq 0 is reserved for handshake/unsolicited frames
+        return self._seq
+
+    def _write_raw(self, data):
+        with self._write_lock:
+            self.ser.write(data)
+
+    def _write(self, data):
+        if not self.connected:
+            return False
+        try:
+            self._write_raw(data)
+            return True
+        except Exception:
+            # The reader thread notices the dead port and reconnects
+            self.connected = False
+            return False
+
+    def send(self, op, payload=b"", state=None, segments=None, traces=()):
+        """Send one command frame and return its sequence number.
+
+        `segments` marks a SEG_UPDATE frame carrying those segment ids; such
+        frames are never resent verbatim (see _resend). `traces` (AlertTrace)
+        get their serial_write and led_ack hops from this frame.
+        """
+        with self._lock:
+            if state is not None:
+                # A new state replaces the running program, which therefore never completes
+                self._programs.clear()
+                self._last_state_cmd = (op, bytes(payload), state)
+                # A newer state supersedes any unacknowledged one; never resend a stale state
+                for old in [s for s, e in self._pending.items() if e[3] is not None]:
+                    del self._pending[old]
+            seq = self._next_seq()
+            frame = protocol.encode_frame(seq, op, payload)
+            self._pending[seq] = [frame, time.perf_counter(), 1, state, segments, traces]
+            self.sent += 1
+        if self._write(frame):
+            hop(traces, "serial_write")
+        return seq
+
+    def set_state(self, state):
+        """Switch the whole strip to a named LED state (e.g. "GREEN")."""
+        return self.send(protocol.OP_SET_STATE, bytes((protocol.STATE_IDS[state],)), state=state)
+
+    def animate(self, color, on_ms, off_ms, repeats=0, duration_ms=0, fallback="GREEN", label="ANIMATE",
+                traces=()):
+        """Run a blink program on the Arduino; it falls back to `fallback` by itself.
+
+        `label` is what `acked_state` reports while the program runs. Completion
+        is reported through `on_done`; if the DONE frame is lost we still report
+        it shortly after the expected end time.
+        """
+        payload = protocol.animate_payload(color, on_ms, off_ms, repeats, duration_ms, fallback)
+        # Same end as the sketch's: the repeat count or the duration, whichever comes first
+        ends = [duration_ms / 1000.0] if duration_ms else []
+        if repeats:
+            ends.append(repeats * ((on_ms or 1) + off_ms) / 1000.0)
+        length = min(ends) if ends else None
+        seq = self.send(protocol.OP_ANIMATE, payload, state=label, traces=traces)
+        if length is not None:
+            with self._lock:
+                self._programs[seq] = (time.perf_counter() + length, fallback)
+        return seq
+
+    def _program_done(self, seq):
+        with self._lock:
+            prog = self._programs.pop(seq, None)
+            if prog is not None:
+                fallback = prog[1]
+                self._last_state_cmd = (protocol.OP_SET_STATE, bytes((protocol.STATE_IDS[fallback],)), fallback)
+        if prog is None:
+            return
+        self.acked_state = prog[1]
+        if self.on_done is not None:
+            self.on_done(seq, prog[1])
+
+    def configure_segments(self, ranges):
+        """Define station segments as (start, count) pixel ranges, in segment id order."""
+        self.segment_ranges = list(ranges)
+        with self._lock:
+            self._segments_sent = {}
+        return self.send(protocol.OP_SEG_CONFIG, protocol.seg_config_payload(self.segment_ranges))
+
+    def update_segments(self, looks, traces=()):
+        """Send only the segments whose look changed since the last update.
+
+        looks maps segment id -> None or ((r, g, b), on_ms, off_ms). Cheap to
+        call every frame: nothing is written when nothing changed.
+        """
+        with self._lock:
+            self._segment_looks.update(looks)
+            if not self.connected:
+                return 0
+            changed = [(seg, look) for seg, look in sorted(looks.items())
+                       if seg not in self._segments_sent or self._segments_sent[seg] != look]
+            for seg, look in changed:
+                self._segments_sent[seg] = look
+        per_frame = protocol.SEG_ENTRIES_PER_FRAME
+        for i in range(0, len(changed), per_frame):
+            chunk = changed[i:i + per_frame]
+            payload = b"".join(protocol.seg_entry(seg, look) for seg, look in chunk)
+            self.send(protocol.OP_SEG_UPDATE, payload, segments=tuple(seg for seg, _ in chunk), traces=traces)
+            self.segment_entries_sent += len(chunk)
+        return len(changed)
+
+    def ping(self):
+        return self.send(protocol.OP_PING)
+
+    # --- receiving --------------------------------------------------------
+
+    def _handle(self, frame):
+        now = time.perf_counter()
+        if frame.op == protocol.OP_ACK:
+            with self._lock:
+                entry = self._pending.pop(frame.seq, None)
+            if entry is None:
+                return
+            self.rtt.append(now - entry[1])
+            hop(entry[5], "led_ack")
+            status = frame.payload[1] if len(frame.payload) > 1 else protocol.STATUS_OK
+            if status == protocol.STATUS_OK and entry[3] is not None:
+                self.acked_state = entry[3]
+        elif frame.op == protocol.OP_DONE:
+            self._program_done(frame.seq)
+        elif frame.op == protocol.OP_NACK:
+            # Corrupted on the way in: resend straight away rather than waiting for the timeout
+            self.nacks += 1
+            with self._lock:
+                entry = self._pending.get(frame.seq)
+            if entry is not None:
+                self._resend(frame.seq, entry)
+        elif frame.op == protocol.OP_STATS:
+            stats = protocol.decode_stats(frame.payload)
+            if stats is not None:
+                self.device_loop_hz, self.device_show_hz = stats
+        elif frame.op == protocol.OP_READY:
+            # The board reset underneath us (e.g. brown-out) and lost its state
+            self.device_info = protocol.decode_ready(frame.payload)
+            threading.Thread(target=self._replay, daemon=True).start()
+
+    def _resend(self, seq, entry):
+        with self._lock:
+            if entry[4] is not None:
+                # Segment frame lost: forget what we sent so the next
+                # update_segments() sends the current look instead of a stale one
+                self._pending.pop(seq, None)
+                for seg in entry[4]:
+                    self._segments_sent.pop(seg, None)
+                self.resent += 1
+                return
+            if entry[2] > self.retries:
+                self._pending.pop(seq, None)
+                self.failed += 1
+                return
+            entry[1] = time.perf_counter()
+            entry[2] += 1
+            self.resent += 1
+        self._write(entry[0])
+
+    def _check_timeouts(self):
+        now = time.perf_counter()
+        with self._lock:
+            overdue = [(s, e) for s, e in self._pending.items() if now - e[1] >= self.ack_timeout]
+        for seq, entry in overdue:
+            self._resend(seq, entry)
+        # Grace period for a DONE frame that never arrived
+        with self._lock:
+            lost = [s for s, (end, _) in self._programs.items() if now - end >= 1.0]
+        for seq in lost:
+            self._program_done(seq)
+
+    def _reader(self):
+        while self._running:
+            if not self.connected:
+                if self.opener is None:
+                    time.sleep(0.05)
+                    continue
+                print("⚠ Arduino disconnected – reconnecting…")
+                self._reconnect()
+                if self.connected:
+                    print(f"✅ Arduino reconnected (handshake {self.handshake_time:.2f} s), LED state replayed.")
+                continue
+            try:
+                data = self.ser.read(self.ser.in_waiting or 1)
+            except Exception:
+                self.connected = False
+                continue
+            if data:
+                for frame in self.parser.feed(data):
+                    self._handle(frame)
+            self._check_timeouts()
+
+    # --- stats ------------------------------------------------------------
+
+    def rtt_summary(self):
+        """Round-trip latency stats (ms) over the recent window."""
+        vals = sorted(self.rtt)
+        if not vals:
+            return {"n": 0}
+        pick = lambda q: vals[min(len(vals) - 1, int(q * len(vals)))] * 1000.0
+        return {
+            "n": len(vals),
+            "p50_ms": pick(0.50),
+            "p95_ms": pick(0.95),
+            "max_ms": vals[-1] * 1000.0,
+            "sent": self.sent,
+            "resent": self.resent,
+            "failed": self.failed,
+            "nacks": self.nacks,
+            "crc_errors": self.parser.crc_errors,
+            "segment_entries_sent": self.segment_entries_sent,
+            "reconnects": self.reconnects,
+            "device_loop_hz": self.device_loop_hz,
+            "device_show_hz": self.device_show_hz,
+        }
+
+    def format_summary(self):
+        s = self.rtt_summary()
+        loop = ""
+        if self.device_loop_hz is not None:
+            loop = f" | arduino loop {self.device_loop_hz} Hz, {self.device_show_hz} shows/s"
+        if not s["n"]:
+            return "LED link: no ACKs yet" + loop
+        return (f"LED link rtt p50={s['p50_ms']:.1f} ms p95={s['p95_ms']:.1f} ms max={s['max_ms']:.1f} ms "
+                f"(sent={s['sent']} resent={s['resent']} failed={s['failed']} crc_err={s['crc_errors']} "
+                f"reconnects={s['reconnects']})" + loop)
@@ -0,0 +1,140 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for sound recognition.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""History of audio levels at three resolutions, without keeping any audio.
+
+  blocks  - every block's dB for the last minute
+  seconds - per-second Leq/max/min for the last hour
+  minutes - per-minute Leq/max/min for the session (up to a day)
+
+Each tier is a preallocated ring of rows; add() is O(1) (a row write per
+block, plus one per finished second or minute), and a range query is two
+binary searches on the ring's time column plus a slice.
+"""
+
+import math
+
+import numpy as np
+
+TIERS = ("blocks", "seconds", "minutes")
+
+
+class _Ring:
+    """Fixed-capacity ring of float64 rows whose first column is a rising time."""
+
+    def __init__(self, capacity, cols):
+        self.rows = np.zeros((capacity, cols))
+        self.n = 0
+        self._next = 0
+
+    def append(self, row):
+        self.rows[self._next] = row
+        self._next = (self._next + 1) % len(self.rows)
+        self.n = min(self.n + 1, len(self.rows))
+
+    def _parts(self):
+        if self.n < len(self.rows):
+            return (self.rows[:self.n],)
+        return self.rows[self._next:], self.rows[:self._next]
+
+    def oldest_t(self):
+        return self._parts()[0][0, 0] if self.n else math.inf
+
+    def ordered(self):
+        """All rows, oldest first (a copy)."""
+        return np.concatenate(self._parts())
+
+    def between(self, t0, t1):
+        """Rows with t0 <= t < t1 (only those are copied)."""
+        return np.concatenate([p[np.searchsorted(p[:, 0], t0):np.searchsorted(p[:, 0], t1)]
+                               for p in self._parts()])
+
+
+class _Bucket:
+    """Energy sum, max and min of the dB values that fall in one time bucket."""
+
+    def __init__(self):
+        self.start = None
+        self.clear()
+
+    def clear(self):
+        self.energy = 0.0
+        self.n = 0
+        self.max = -math.inf
+        self.min = math.inf
+
+    def add(self, db, energy=None, n=1, hi=None, lo=None):
+        self.energy += 10.0 ** (db / 10.0) * n if energy is None else energy
+        self.n += n
+        self.max = max(self.max, db if hi is None else hi)
+        self.min = min(self.min, db if lo is None else lo)
+
+    def row(self):
+        """(start, Leq, max, min, n)."""
+        return self.start, 10.0 * math.log10(self.energy / self.n + 1e-30), self.max, self.min, self.n
+
+
+class LevelHistory:
+    """Tiered store of block levels; see the module docstring for the tiers."""
+
+    def __init__(self, block_sec, block_span_sec=60.0, second_span_sec=3600.0, minute_span_min=1440):
+        self.block_sec = block_sec
+        self._tiers = {
+            "blocks": _Ring(int(math.ceil(block_span_sec / block_sec)), 2),    # t, dB
+            "seconds": _Ring(int(second_span_sec), 5),                         # t, Leq, max, min, n
+            "minutes": _Ring(int(minute_span_min), 5),
+        }
+        self._second = _Bucket()
+        self._minute = _Bucket()
+
+    def add(self, t, db):
+        """Record one block's level at time t (seconds, e.g. time.time())."""
+        self._tiers["blocks"].append((t, db))
+        sec = math.floor(t)
+        if self._second.start != sec:
+            if self._second.n:
+                self._close_second()
+            self._second.start = sec
+            self._second.clear()
+        self._second.add(db)
+
+    def _close_second(self):
+        row = self._second.row()
+        self._tiers["seconds"].append(row)
+        minute = math.floor(row[0] / 60.0) * 60.0
+        if self._minute.start != minute:
+            if self._minute.n:
+                self._tiers["minutes"].append(self._minute.row())
+            self._minute.start = minute
+            self._minute.clear()
+        self._minute.add(row[1], energy=self._second.energy, n=row[4], hi=row[2], lo=row[3])
+
+    def query(self, tier, t0=-math.inf, t1=math.inf):
+        """Rows of `tier` with t0 <= t < t1, oldest first: (t, dB) for blocks,
+        (start, Leq, max, min, blocks) for seconds and minutes."""
+        return self._tiers[tier].between(t0, t1)
+
+    def recent(self, seconds, now):
+        """The finest tier that still covers the last `seconds` before `now`, and its rows."""
+        for tier in TIERS[:-1]:
+            if self._tiers[tier].oldest_t() <= now - seconds:
+                break
+        else:
+            tier = TIERS[-1]
+        return tier, self.query(tier, now - seconds)
+
+    def flush(self):
+        """Close the open second and minute (end of session)."""
+        if self._second.n:
+            self._close_second()
+            self._second.clear()
+        if self._minute.n:
+            self._tiers["minutes"].append(self._minute.row())
+            self._minute.clear()
+
+    def save(self, path):
+        """Flush, then write every tier to an .npz file for post-session reports."""
+        self.flush()
+        np.savez_compressed(path, block_sec=self.block_sec,
+                            **{tier: ring.ordered() for tier, ring in self._tiers.items()})
@@ -0,0 +1,120 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code to calibrate the system's sound levels.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""Fixed-memory statistics over a stream of dB values."""
+
+import math
+
+import numpy as np
+
+_NAN = float("nan")
+
+
+class DbHistogram:
+    """Histogram of dB values with `step` dB bins between `lo` and `hi`.
+
+    Memory is fixed (1201 counters by default) however long it runs, and
+    quantiles are exact to half a bin. Values outside [lo, hi] land in the
+    end bins. The mean is the running mean of the dB values themselves;
+    `leq` is the energy average (equivalent continuous level).
+    """
+
+    def __init__(self, lo=-120.0, hi=0.0, step=0.1):
+        self.lo = lo
+        self.step = step
+        self.counts = np.zeros(int(round((hi - lo) / step)) + 1, dtype=np.int64)
+        self.n = 0
+        self.mean = 0.0
+        self.energy = 0.0
+
+    def add(self, db):
+        i = int((db - self.lo) / self.step + 0.5)
+        self.counts[min(max(i, 0), len(self.counts) - 1)] += 1
+        self.n += 1
+        self.mean += (db - self.mean) / self.n
+        self.energy += 10.0 ** (db / 10.0)
+
+    @property
+    def leq(self):
+        """Energy-averaged level, 10*log10(mean(10^(dB/10)))."""
+        return 10.0 * math.log10(self.energy / self.n + 1e-30) if self.n else _NAN
+
+    def levels(self):
+        """(Leq, L10, L50, L90): Lx is the level exceeded x % of the time."""
+        l10, l50, l90 = self.quantiles((0.90, 0.50, 0.10))
+        return round(self.leq, 2) if self.n else _NAN, l10, l50, l90
+
+    def quantiles(self, qs):
+        """dB value below which a fraction q of the values fall, for each q in qs."""
+        if self.n == 0:
+            return [float("nan")] * len(qs)
+        cum = np.cumsum(self.counts)
+        idx = np.searchsorted(cum, [q * self.n for q in qs])
+        return [round(self.lo + int(i) * self.step, 2) for i in idx]
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def reset(self):
+        self.counts[:] = 0
+        self.n = 0
+        self.mean = 0.0
+        self.energy = 0.0
+
+
+class AcousticStats:
+    """Leq/L10/L50/L90 of the block levels over several horizons at once.
+
+    `horizons` maps a name to a window length in seconds; None means the
+    window only ends when roll(name) is called (the session, or the task
+    rotation, which the monitor signals). add() is O(1) per block. The
+    levels of the open windows are recomputed once per `refresh_sec` into
+    `current`, and a closed window's levels go to `completed`; both dicts
+    are replaced, never mutated, so other threads can read them as they are.
+    """
+
+    NAMES = ("Leq", "L10", "L50", "L90")
+
+    def __init__(self, block_sec, horizons, refresh_sec=1.0, on_complete=None):
+        self.block_sec = block_sec
+        self.horizons = dict(horizons)
+        self._hist = {name: DbHistogram() for name in self.horizons}
+        self._window_blocks = {name: int(round(sec / block_sec)) if sec else 0
+                               for name, sec in self.horizons.items()}
+        self._refresh_blocks = max(1, int(round(refresh_sec / block_sec)))
+        self._blocks = 0
+        self.on_complete = on_complete    # called as on_complete(name, levels, seconds)
+        self.current = {name: (_NAN,) * 4 for name in self.horizons}
+        self.completed = {}
+
+    def add(self, db):
+        self._blocks += 1
+        for name, h in self._hist.items():
+            h.add(db)
+            if h.n == self._window_blocks[name]:
+                self.roll(name)
+        if self._blocks % self._refresh_blocks == 0:
+            self.current = {name: h.levels() for name, h in self._hist.items()}
+
+    def roll(self, name):
+        """Close the current window of one horizon and start the next."""
+        h = self._hist[name]
+        if h.n:
+            levels = h.levels()
+            self.completed = dict(self.completed, **{name: levels})
+            if self.on_complete is not None:
+                self.on_complete(name, levels, h.n * self.block_sec)
+        h.reset()
+
+    def levels(self, name):
+        """Levels of the open window, computed now."""
+        return self._hist[name].levels()
+
+    def as_dict(self):
+        return {name: dict(zip(self.NAMES, self.levels(name)))
+                for name in self.horizons}
+
+    @classmethod
+    def format_levels(cls, levels):
+        return "  ".join(f"{k} {v:.1f}" for k, v in zip(cls.NAMES, levels))
@@ -0,0 +1,140 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for sound recognition.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""Which station is the noise coming from? TDOA across a microphone pair.
+
+The audio callback only copies loud blocks of the two mics into a fixed
+set of slots (submit()); a worker thread cross-correlates them with
+GCC-PHAT (FFT, phase transform, inverse FFT, peak within the physically
+possible lag), turns the delay into a bearing and the bearing into a
+station using the ranges from "sound_bearings" in zones.json.
+
+Bearing convention: 0 deg is straight ahead of the pair (broadside),
+negative towards the first mic of the pair, positive towards the second.
+"""
+
+import math
+import queue
+import threading
+import time
+
+import numpy as np
+
+SPEED_OF_SOUND = 343.0
+
+
+class TdoaLocalizer:
+    """Streaming GCC-PHAT bearing estimator for one mic pair, run off the audio thread."""
+
+    SLOTS = 8
+
+    def __init__(self, samplerate, blocksize, pair=(0, 1), spacing_m=0.5, station_bearings=None,
+                 hold_sec=1.0):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.pair = tuple(pair)
+        self.spacing_m = spacing_m
+        self.station_bearings = station_bearings or {}
+        self.hold_sec = hold_sec
+
+        self.max_lag = max(1, int(math.ceil(spacing_m / SPEED_OF_SOUND * samplerate)))
+        self._nfft = 1 << int(math.ceil(math.log2(2 * blocksize)))
+        self._slots = np.zeros((self.SLOTS, blocksize, 2), np.float32)
+        self._free = queue.Queue()
+        for i in range(self.SLOTS):
+            self._free.put(i)
+        self._todo = queue.Queue()
+
+        self._bearing_sum = 0.0
+        self._weight_sum = 0.0
+        self.bearing_deg = None
+        self.station = None
+        self.peak = 0.0
+        self.updated_at = 0.0
+
+        # Cost accounting
+        self.blocks = 0
+        self.dropped = 0
+        self.cost_ms_avg = 0.0
+        self.cost_ms_max = 0.0
+
+    def start(self):
+        threading.Thread(target=self._worker, daemon=True).start()
+        return self
+
+    def submit(self, x, t=None):
+        """Queue the pair's channels of a (frames, channels) block; called from the audio callback."""
+        try:
+            i = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        n = min(len(x), self.blocksize)
+        slot = self._slots[i]
+        slot[:n, 0] = x[:n, self.pair[0]]
+        slot[:n, 1] = x[:n, self.pair[1]]
+        slot[n:] = 0.0
+        self._todo.put((i, time.time() if t is None else t))
+
+    def recent(self, now=None):
+        """(station, bearing_deg) if there was an estimate within hold_sec, else (None, None)."""
+        now = time.time() if now is None else now
+        if self.bearing_deg is None or now - self.updated_at > self.hold_sec:
+            return None, None
+        return self.station, self.bearing_deg
+
+    def _worker(self):
+        while True:
+            i, t = self._todo.get()
+            t0 = time.perf_counter()
+            try:
+                lag, peak = self.gcc_phat(self._slots[i, :, 0], self._slots[i, :, 1])
+            finally:
+                self._free.put(i)
+            self._update(lag, peak, t)
+            self._account((time.perf_counter() - t0) * 1000.0)
+
+    def gcc_phat(self, a, b):
+        """Delay of b relative to a in samples (positive: b hears it later) and the PHAT peak."""
+        A = np.fft.rfft(a, self._nfft)
+        B = np.fft.rfft(b, self._nfft)
+        R = B * np.conj(A)
+        R /= np.abs(R) + 1e-12
+        cc = np.fft.irfft(R, self._nfft)
+        m = self.max_lag
+        window = np.concatenate((cc[-m:], cc[:m + 1]))     # lags -m..m
+        k = int(np.argmax(window))
+        return k - m, float(window[k])
+
+    def _update(self, lag, peak, t):
+        # A source near the first mic reaches it first -> positive lag -> negative bearing
+        s = max(-1.0, min(1.0, -lag / self.samplerate * SPEED_OF_SOUND / self.spacing_m))
+        bearing = math.degrees(math.asin(s))
+        if t - self.updated_at > self.hold_sec:
+            self._bearing_sum = self._weight_sum = 0.0    # new event
+        self._bearing_sum += peak * bearing
+        self._weight_sum += peak
+        self.bearing_deg = self._bearing_sum / max(self._weight_sum, 1e-9)
+        self.peak = peak
+        self.station = self.station_for(self.bearing_deg)
+        self.updated_at = t
+
+    def station_for(self, bearing):
+        for key, (lo, hi) in self.station_bearings.items():
+            if lo <= bearing <= hi:
+                return key
+        return None
+
+    def _account(self, cost_ms):
+        self.blocks += 1
+        if self.blocks == 1:
+            self.cost_ms_avg = cost_ms
+        else:
+            self.cost_ms_avg += 0.05 * (cost_ms - self.cost_ms_avg)
+        self.cost_ms_max = max(self.cost_ms_max, cost_ms)
+
+    def format_summary(self):
+        return (f"TDOA: {self.blocks} blocks, {self.cost_ms_avg * 1000:.0f} µs/block avg, "
+                f"{self.cost_ms_max * 1000:.0f} µs max, {self.dropped} dropped "
+                f"(pair ch{self.pair[0]}/ch{self.pair[1]}, {self.spacing_m:g} m, ±{self.max_lag} samples)")
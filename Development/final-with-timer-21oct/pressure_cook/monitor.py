@@ -0,0 +1,367 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code to have task rotation, camera tracking, sound recognition and simulated fallbacks.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and how the code priorities and arduino connections should be done at all times.
+
+"""The station monitor: camera + microphone in, speech + LEDs out.
+
+Nothing happens on import; main() parses the command line, brings the
+Arduino, camera and microphone up in parallel and runs the vision loop.
+"""
+
+import select
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from . import backends, protocol
+from .alerts import PRIO_COUNTDOWN, PRIO_MARKER, PRIO_SOUND, AlertController
+from .audio_pipeline import AudioPipeline, AudioSnapshot
+from .audio_proc import AudioProcess
+from .config import parse_args
+from .led_link import list_serial_ports
+from .profiler import FrameProfiler
+from .speech import Speaker
+from .tracing import AlertTracer
+from .vision import (MarkerDetector, draw_acoustics, draw_audio_bar, draw_audio_features, draw_marker,
+                     draw_profile, draw_stations, marker_center)
+from .zones import CAMERA_MARKERS, MARKER_TO_STATION, STATION_KEYS, StationMap, station_label
+
+MARKER_OUT_LOOK = (protocol.STATE_COLORS["RED_BLINK"], 250, 250)
+
+TASK_INTERVAL = 45
+FINAL_TIMEOUT_SEC = 300
+VOLUME_TTS_COOLDOWN = 4.0
+
+
+class Monitor:
+    """One monitoring session. startup() opens the devices, run() is the vision loop."""
+
+    def __init__(self, args):
+        self.args = args
+        self.stations = StationMap()
+        self.detector = MarkerDetector()
+
+        self.led_link = backends.make_led_sink(args.leds, args.serial_port)
+        self.cam = backends.make_frame_source(
+            args.camera, args.camera_index,
+            markers={m: self.stations.center(s) for m, s in MARKER_TO_STATION.items()})
+        self.audio = None
+        self.audio_state = AudioSnapshot()
+
+        self.speaker = Speaker(backends.make_speech_sink(args.speech, voice=args.voice, rate=args.rate))
+        self.alerts = AlertController(self.led_link, self.speaker)
+
+        # State tracking
+        self.marker_state = {m: False for m in CAMERA_MARKERS}
+        self.last_task_switch = time.time()
+        self.task_interval = TASK_INTERVAL
+        self.simulated_queue = []
+
+        # Volume alarm throttling
+        self.last_volume_tts_ts = 0.0
+        self.prev_volume_loud = False
+
+        self.timings = {}
+        self.prof = FrameProfiler()
+        self.tracer = AlertTracer(path=args.trace_out)
+        self.pending_traces = {"marker": [], "sound": []}    # detected, not yet through arbitration
+        self._first_frame = None
+        self.session_over = threading.Event()    # set by final_timeout_sequence; ends run()
+
+    # --- startup ----------------------------------------------------------
+
+    def _start_leds(self):
+        t_hs = self.led_link.connect(timeout=5.0)
+        self.led_link.start()
+        self.led_link.configure_segments(self.stations.segment_ranges())
+        return t_hs
+
+    def _start_camera(self):
+        try:
+            self.cam.open()
+        except Exception as e:
+            raise Exception(f"⚠ Could not open camera: {e}")
+        if isinstance(self.cam, backends.FakeFrameSource):
+            self._check_fake_camera()
+        # Warm-up read: the first frame is often slow while the sensor settles
+        ret, frame = self.cam.read()
+        if ret:
+            self._first_frame = frame
+
+    def _check_fake_camera(self):
+        """Warn if the fake camera's scene would not exercise the marker paths it is meant to."""
+        cam = self.cam
+        if any(self.stations.is_in_tray(cam.wander_to, st) for st in STATION_KEYS):
+            print(f"⚠ Fake camera: marker {cam.wander_id} wanders to {cam.wander_to}, inside a station")
+        for marker_id, where in cam.undetected(self.detector.detect):
+            print(f"⚠ Fake camera: marker {marker_id} ({where}) is drawn but not detected")
+
+    def _start_audio(self):
+        pipeline = AudioProcess if self.args.audio_process else AudioPipeline
+        self.audio = pipeline(self.args, self.stations).open().start()
+
+    def _timed(self, name, fn):
+        t0 = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            self.timings[name] = time.perf_counter() - t0
+
+    def startup(self):
+        """Open the Arduino, camera and microphone concurrently; report how long each took."""
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            leds = pool.submit(self._timed, "arduino", self._start_leds)
+            cam = pool.submit(self._timed, "camera", self._start_camera)
+            audio = pool.submit(self._timed, "audio", self._start_audio)
+
+            try:
+                t_hs = leds.result()
+            except Exception as e:
+                print(f"⚠ Could not connect to Arduino: {e}")
+                if self.args.leds == "serial":
+                    print("Available ports:")
+                    for line in list_serial_ports():
+                        print(f"  {line}")
+                sys.exit(1)
+            cam.result()
+            audio.result()
+        self.timings["startup"] = time.perf_counter() - t0
+
+        print(f"✅ Arduino connected on {self.led_link.ser.port} @ {protocol.BAUD_RATE} baud (ready in {t_hs:.2f} s).")
+        for line in self.audio.describe():
+            print(line)
+        print("🎙️  Mic monitor running…")
+        print("⏱  Startup: " + "  ".join(f"{k} {self.timings[k]:.2f} s" for k in ("arduino", "camera", "audio"))
+              + f"  (wall {self.timings['startup']:.2f} s)")
+
+        self.speaker.start()
+        threading.Thread(target=self.simulator_input, daemon=True).start()
+        if self.args.print_serial:
+            threading.Thread(target=self.serial_stats_reporter, daemon=True).start()
+        threading.Thread(target=self.final_timeout_sequence, daemon=True).start()
+
+    # --- background threads -----------------------------------------------
+
+    def simulator_input(self):
+        """Background thread for keyboard simulation of events."""
+        print("Simulator ready: enter 1=marker out, 2=too loud, 3=too quiet, 4=recipe")
+        while True:
+            if sys.stdin in select.select([sys.stdin], [], [], 0)[0]:
+                key = sys.stdin.readline().strip()
+                if key:
+                    self.simulated_queue.append(key)
+            time.sleep(0.05)
+
+    def serial_stats_reporter(self):
+        """Print LED command round-trip latency periodically."""
+        while True:
+            time.sleep(10)
+            print(self.led_link.format_summary())
+
+    def final_timeout_sequence(self):
+        """After 5 minutes, play the final warning and end the vision loop (main() then runs close())."""
+        time.sleep(FINAL_TIMEOUT_SEC)
+        print("⏰ Final timeout reached – entering shutdown mode")
+        self.alerts.final_timeout()
+        print("🔚 Session complete. Exiting.")
+        self.session_over.set()
+
+    # --- vision loop --------------------------------------------------------
+
+    def find_markers_out(self, frame):
+        """Detect markers outside their stations and draw them on the frame."""
+        current_out = set()
+        gray = self.detector.to_gray(frame)
+        self.prof.lap("cvtColor")
+        corners, ids = self.detector.detect_gray(gray)
+        self.prof.lap("detectMarkers")
+        if ids is not None:
+            for i, marker_id in enumerate(ids.flatten()):
+                if marker_id not in CAMERA_MARKERS:
+                    continue
+                pts, center = marker_center(corners[i])
+                in_tray = self.stations.is_in_tray(center, MARKER_TO_STATION[marker_id])
+                if not in_tray:
+                    current_out.add(marker_id)
+                draw_marker(frame, pts, center, marker_id, in_tray)
+        self.prof.lap("zones")
+        return current_out
+
+    def update_alerts(self, current_out, t_capture=None):
+        """Priority-based alert handling for one frame (captured at t_capture)."""
+        alerts = self.alerts
+        now = time.time()
+        pending = self.pending_traces
+
+        # A trace per marker that just left its tray; they all share this frame's segment update
+        new_traces = [self.tracer.start("marker", t_capture or now, detect=now)
+                      for m in current_out if not self.marker_state[m]]
+        pending["marker"] += new_traces
+        if not current_out:
+            pending["marker"].clear()
+
+        # Per-station segments: only changed stations are sent to the Arduino
+        seg_looks = {i: None for i in self.stations.segment_index.values()}
+        for marker_id in current_out:
+            seg_looks[self.stations.segment_index[MARKER_TO_STATION[marker_id]]] = MARKER_OUT_LOOK
+        self.led_link.update_segments(seg_looks, traces=new_traces)
+
+        alerts.release_hold(now)
+        task_due = (now - self.last_task_switch) >= (self.task_interval - 5)
+        aruco_out = bool(current_out)
+        audio = self.audio_state
+        sound_loud = audio.volume_loud
+        if audio.voice_active is not None:
+            # Loud clatter or fans are not what the voice alert is about
+            sound_loud = sound_loud and audio.voice_active
+
+        # Handle volume going from loud to quiet
+        if self.prev_volume_loud and not sound_loud:
+            alerts.clear_sound_alert(back_to_green=not task_due and not aruco_out)
+            pending["sound"].clear()
+        elif sound_loud and not self.prev_volume_loud:
+            pending["sound"].append(self.tracer.start("sound", audio.t or now, detect=now))
+        self.prev_volume_loud = sound_loud
+
+        if task_due and PRIO_COUNTDOWN >= alerts.current_priority:
+            self.last_task_switch = now
+            self.audio.new_task()
+            alerts.countdown_task_switch()
+
+        elif aruco_out and PRIO_MARKER > alerts.current_priority:
+            # The offending stations already blink red on their own segments
+            if alerts.speak_and_blink("Counter too messy. Please clean up.", None, times=6, delay=0.35,
+                                      priority=PRIO_MARKER, tag="marker", traces=pending["marker"]):
+                pending["marker"] = []
+
+        elif (not task_due) and (not aruco_out) and sound_loud and PRIO_SOUND >= alerts.current_priority:
+            now_ts = time.time()
+            if now_ts - self.last_volume_tts_ts >= VOLUME_TTS_COOLDOWN:
+                self.last_volume_tts_ts = now_ts
+                where = audio.located_station or audio.loud_station
+                bearing = audio.bearing
+                if where:
+                    print(f"🔊 Too loud at {where} ({audio.avg_db:.1f} dBFS"
+                          + (f", bearing {bearing:+.0f}°)" if bearing is not None else ")"))
+                msg = f"Volume is too loud at {station_label(where)}. Calm down" if where else "Volume is too loud. Calm down"
+                if alerts.speak_and_blink(msg,
+                                          "YELLOW_BLINK", times=5, delay=0.35,
+                                          priority=PRIO_SOUND, tag="sound", traces=pending["sound"]):
+                    pending["sound"] = []
+
+        else:
+            # Idle state - return to green if no alerts
+            if alerts.current_priority == 0 and not alerts.blink_active and not task_due \
+                    and not aruco_out and not sound_loud:
+                alerts.send_led_state("GREEN")
+
+        # Process simulator input when no high-priority events
+        if not task_due:
+            while self.simulated_queue:
+                key = self.simulated_queue.pop(0)
+                if key == "1":
+                    alerts.speak_and_blink("Counter too messy. Please clean up.", "RED_BLINK", tag="marker")
+                elif key == "2":
+                    alerts.speak_and_blink("Volume is too loud. Calm down", "YELLOW_BLINK", tag="sound")
+                elif key == "3":
+                    alerts.speak_and_blink("Too quiet. Not enough socialising", "YELLOW_BLINK", tag="quiet")
+                elif key == "4":
+                    alerts.speak_and_blink("Please follow the recipe carefully", "PINK_BLINK", tag="recipe")
+
+    def track_marker_state(self, current_out):
+        """Print marker state changes."""
+        for marker_id in CAMERA_MARKERS:
+            if marker_id in current_out and not self.marker_state[marker_id]:
+                print(f"⚠ Marker {marker_id} out!")
+                self.marker_state[marker_id] = True
+            elif marker_id not in current_out and self.marker_state[marker_id]:
+                print(f"✅ Marker {marker_id} back")
+                self.marker_state[marker_id] = False
+
+    def run(self, t_launch=None):
+        """Vision loop; returns when 'q' is pressed in the preview window or the session is over."""
+        first = True
+        prof = self.prof
+        while not self.session_over.is_set():
+            prof.begin()
+            if self._first_frame is not None:
+                ret, frame, self._first_frame = True, self._first_frame, None
+            else:
+                ret, frame = self.cam.read()
+            if not ret:
+                continue
+            t_capture = time.time()
+            prof.lap("cam.read")
+
+            # One consistent copy of the audio state per frame
+            self.audio_state = audio = self.audio.read()
+            prof.lap("audio.read")
+            current_out = self.find_markers_out(frame)
+            self.update_alerts(current_out, t_capture)
+            self.track_marker_state(current_out)
+            prof.lap("alerts")
+            draw_stations(frame, self.stations)
+            y = draw_audio_bar(frame, audio.avg_db, audio.volume_loud, audio.trig_db, audio.rel_db,
+                               audio.floor_db, audio.voice_active)
+            if audio.features is not None:
+                draw_audio_features(frame, audio.features, y + 18)
+            if audio.acoustics is not None:
+                draw_acoustics(frame, audio.acoustics, y + 36)
+            if self.args.profile_overlay:
+                draw_profile(frame, prof.overlay_lines())
+            prof.lap("overlay")
+
+            if first and t_launch is not None:
+                print(f"⏱  First frame analysed {time.perf_counter() - t_launch:.2f} s after launch")
+            first = False
+
+            if not self.args.headless:
+                cv2.imshow("Utensil Monitor", frame)
+                key = cv2.waitKey(1)
+                prof.lap("imshow")
+                if key & 0xFF == ord('q'):
+                    break
+            prof.end()
+
+    def close(self):
+        """End of session (q, Ctrl+C or the final timeout): summaries, saved files, devices closed."""
+        try:
+            print(self.led_link.format_summary())
+            print(self.speaker.format_summary())
+            print(self.prof.format_summary())
+            for line in self.tracer.format_summary():
+                print(line)
+            if self.args.trace_out:
+                path = self.tracer.close()
+                print(f"📁 {self.tracer.written} alert traces saved to {path}")
+            if self.args.profile_out:
+                print(f"📁 Frame profile saved to {self.prof.dump(self.args.profile_out)}")
+        finally:
+            # Stopping the audio saves --save-levels; it must happen even if a file above could not be written
+            if self.audio is not None:
+                for line in self.audio.stop():
+                    print(line)
+            self.cam.release()
+            if not self.args.headless:
+                cv2.destroyAllWindows()
+
+
+def main(argv=None):
+    t_launch = time.perf_counter()
+    args = parse_args(argv)
+    monitor = Monitor(args)
+    monitor.startup()
+    try:
+        monitor.run(t_launch)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.close()
+
+
+if __name__ == "__main__":
+    main()
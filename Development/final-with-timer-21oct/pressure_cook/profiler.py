@@ -0,0 +1,114 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for camera tracking.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""Where does a frame's time go? Per-stage timing of the vision loop.
+
+The loop calls begin() when a frame starts and lap(stage) after each
+stage; the time since the previous lap is recorded for that stage in a
+ring of the last `window` frames, so percentiles always describe the
+recent past. Recording is two perf_counter() calls and an array write per
+stage; percentiles are only computed when asked for.
+"""
+
+import csv
+import json
+import time
+
+import numpy as np
+
+
+class _StageTimes:
+    """Ring of the last `window` durations (ms) of one stage, plus session totals."""
+
+    def __init__(self, window):
+        self.ring = np.zeros(window)
+        self.n = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.ring[self.n % len(self.ring)] = ms
+        self.n += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def stats(self):
+        recent = self.ring[:min(self.n, len(self.ring))]
+        p50, p95, p99 = np.percentile(recent, (50, 95, 99)) if len(recent) else (0.0, 0.0, 0.0)
+        return {"frames": self.n, "mean_ms": round(self.total_ms / max(self.n, 1), 3),
+                "p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3),
+                "p99_ms": round(float(p99), 3), "max_ms": round(self.max_ms, 3)}
+
+
+class FrameProfiler:
+    """Rolling per-stage latency percentiles and FPS for the vision loop."""
+
+    FIELDS = ("stage", "frames", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+
+    def __init__(self, window=300):
+        self.window = window
+        self.stages = {}                  # insertion order = loop order
+        self._frame_ends = np.zeros(window)
+        self.frames = 0
+        self._t_frame = None
+        self._t_lap = None
+
+    def begin(self):
+        self._t_frame = self._t_lap = time.perf_counter()
+
+    def lap(self, stage):
+        t = time.perf_counter()
+        times = self.stages.get(stage)
+        if times is None:
+            times = self.stages[stage] = _StageTimes(self.window)
+        times.add((t - self._t_lap) * 1000.0)
+        self._t_lap = t
+
+    def end(self):
+        """Close the frame: records the whole frame as stage "frame" and its end time for FPS."""
+        t = time.perf_counter()
+        self._t_lap = self._t_frame
+        self.lap("frame")
+        self._frame_ends[self.frames % self.window] = t
+        self.frames += 1
+
+    @property
+    def fps(self):
+        n = min(self.frames, self.window)
+        if n < 2:
+            return 0.0
+        last = self._frame_ends[(self.frames - 1) % self.window]
+        first = self._frame_ends[(self.frames - n) % self.window]
+        return (n - 1) / max(last - first, 1e-9)
+
+    def stats(self):
+        return {stage: times.stats() for stage, times in self.stages.items()}
+
+    def overlay_lines(self):
+        return [f"{self.fps:5.1f} fps"] + [f"{stage:<14}{s['p50_ms']:6.2f} {s['p95_ms']:6.2f} {s['p99_ms']:6.2f} ms"
+                                         for stage, s in self.stats().items()]
+
+    def format_summary(self):
+        frame = self.stages.get("frame")
+        if frame is None:
+            return "Frames: none"
+        s = frame.stats()
+        slowest = max((st for st in self.stages if st != "frame"),
+                      key=lambda st: self.stages[st].stats()["p95_ms"], default=None)
+        return (f"Frames: {self.frames} at {self.fps:.1f} fps, frame p50 {s['p50_ms']:.1f} / p95 {s['p95_ms']:.1f} / "
+                f"p99 {s['p99_ms']:.1f} ms" + (f", slowest stage {slowest}" if slowest else ""))
+
+    def dump(self, path):
+        """Write the stage table to `path`: JSON if it ends in .json, else CSV."""
+        stats = self.stats()
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            if path.endswith(".json"):
+                json.dump({"frames": self.frames, "fps": round(self.fps, 2), "window": self.window,
+                           "stages": stats}, f, indent=2)
+            else:
+                w = csv.DictWriter(f, fieldnames=self.FIELDS)
+                w.writeheader()
+                for stage, s in stats.items():
+                    w.writerow(dict(s, stage=stage))
+        return path
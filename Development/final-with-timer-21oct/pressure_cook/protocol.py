@@ -0,0 +1,248 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for the Arduino serial protocol.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""Compact framed serial protocol shared with merged-arduino.ino.
+
+Frame layout (all single bytes unless noted):
+
+    SYNC(0xA5) | VERSION | SEQ | OPCODE | LEN | PAYLOAD[LEN] | CRC8
+
+CRC8 is CRC-8/ATM (poly 0x07, init 0x00) over VERSION..PAYLOAD.
+Keep the constants here in sync with the #defines in the sketch.
+"""
+
+SYNC = 0xA5
+VERSION = 1
+BAUD_RATE = 115200
+MAX_PAYLOAD = 32
+
+# Host -> Arduino
+OP_PING = 0x01
+OP_SET_STATE = 0x02
+OP_ANIMATE = 0x03       # blink program that falls back to a state by itself
+OP_SEG_CONFIG = 0x04    # define station segments as pixel ranges
+OP_SEG_UPDATE = 0x05    # delta update: only the segments that changed
+
+# Arduino -> host
+OP_ACK = 0x80
+OP_NACK = 0x81
+OP_STATS = 0x82         # unsolicited loop-rate telemetry, ~1 Hz
+OP_DONE = 0x83          # an ANIMATE program finished (seq = the ANIMATE's seq)
+OP_READY = 0x84         # sent once from setup(): firmware is up (replaces the fixed 2 s sleep)
+
+# ACK status codes
+STATUS_OK = 0
+STATUS_BAD_OPCODE = 1
+STATUS_BAD_PARAM = 2
+
+# LED strip layout; must match NUMPIXELS / MAX_SEGMENTS in the sketch
+DEFAULT_LED_COUNT = 30
+MAX_SEGMENTS = 6
+SEG_ENTRY_SIZE = 7              # seg, flags, r, g, b, on (10 ms units), off (10 ms units)
+SEG_ENTRIES_PER_FRAME = MAX_PAYLOAD // SEG_ENTRY_SIZE
+SEG_ACTIVE = 0x01               # flag: segment overrides the whole-strip state
+
+# OP_DONE reasons
+DONE_COMPLETED = 0
+
+# NACK reasons
+NACK_BAD_CRC = 1
+NACK_BAD_VERSION = 2
+NACK_TOO_LONG = 3
+
+# LED state ids, same order as the `State` enum in the sketch
+STATE_IDS = {
+    "OFF": 0,
+    "GREEN": 1,
+    "BLUE_BLINK": 2,
+    "RED_BLINK": 3,
+    "YELLOW_BLINK": 4,
+    "PINK_BLINK": 5,
+    "WHITE_BLINK": 6,
+}
+STATE_NAMES = {v: k for k, v in STATE_IDS.items()}
+
+# Colours the sketch uses for each state (stateColor() in the sketch)
+STATE_COLORS = {
+    "OFF": (0, 0, 0),
+    "GREEN": (0, 255, 0),
+    "BLUE_BLINK": (0, 0, 255),
+    "RED_BLINK": (255, 0, 0),
+    "YELLOW_BLINK": (255, 180, 0),
+    "PINK_BLINK": (255, 50, 180),
+    "WHITE_BLINK": (255, 255, 255),
+}
+
+OP_NAMES = {
+    OP_PING: "PING",
+    OP_SET_STATE: "SET_STATE",
+    OP_ANIMATE: "ANIMATE",
+    OP_SEG_CONFIG: "SEG_CONFIG",
+    OP_SEG_UPDATE: "SEG_UPDATE",
+    OP_ACK: "ACK",
+    OP_NACK: "NACK",
+    OP_STATS: "STATS",
+    OP_DONE: "DONE",
+    OP_READY: "READY",
+}
+
+
+def crc8(data, crc=0):
+    """CRC-8/ATM (poly 0x07) as used by the sketch."""
+    for b in data:
+        crc ^= b
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+def encode_frame(seq, op, payload=b""):
+    """Build one frame ready to write to the serial port."""
+    payload = bytes(payload)
+    if len(payload) > MAX_PAYLOAD:
+        raise ValueError(f"payload too long ({len(payload)} > {MAX_PAYLOAD})")
+    body = bytes((VERSION, seq & 0xFF, op & 0xFF, len(payload))) + payload
+    return bytes((SYNC,)) + body + bytes((crc8(body),))
+
+
+def set_state_frame(seq, state):
+    """Frame for OP_SET_STATE with a state name such as "GREEN"."""
+    return encode_frame(seq, OP_SET_STATE, bytes((STATE_IDS[state],)))
+
+
+def animate_payload(color, on_ms, off_ms, repeats=0, duration_ms=0, fallback="GREEN"):
+    """OP_ANIMATE payload.
+
+    color is (r, g, b). The program blinks `repeats` on/off cycles or runs for
+    `duration_ms` (whichever ends first; both 0 = until replaced), then the
+    sketch enters `fallback` and reports OP_DONE. off_ms = 0 gives a steady
+    colour; with `repeats` it is held for repeats * on_ms.
+    """
+    r, g, b = color
+    on_ms = max(0, min(0xFFFF, int(on_ms)))
+    off_ms = max(0, min(0xFFFF, int(off_ms)))
+    duration_ms = max(0, min(0xFFFF, int(duration_ms)))
+    return bytes((
+        r & 0xFF, g & 0xFF, b & 0xFF,
+        on_ms & 0xFF, on_ms >> 8,
+        off_ms & 0xFF, off_ms >> 8,
+        max(0, min(255, int(repeats))),
+        duration_ms & 0xFF, duration_ms >> 8,
+        STATE_IDS[fallback],
+    ))
+
+
+def seg_config_payload(ranges):
+    """OP_SEG_CONFIG payload from a list of (start, count) pixel ranges."""
+    if len(ranges) > MAX_SEGMENTS:
+        raise ValueError(f"at most {MAX_SEGMENTS} segments")
+    out = bytearray((len(ranges),))
+    for start, count in ranges:
+        out += int(start).to_bytes(2, "little") + int(count).to_bytes(2, "little")
+    return bytes(out)
+
+
+def seg_entry(seg, look):
+    """One OP_SEG_UPDATE entry.
+
+    look is None (segment shows the whole-strip state again) or
+    ((r, g, b), on_ms, off_ms); off_ms = 0 gives a steady colour.
+    """
+    if look is None:
+        return bytes((seg, 0, 0, 0, 0, 0, 0))
+    (r, g, b), on_ms, off_ms = look
+    on10 = max(0, min(255, int(on_ms) // 10))
+    off10 = max(0, min(255, int(off_ms) // 10))
+    return bytes((seg, SEG_ACTIVE, r & 0xFF, g & 0xFF, b & 0xFF, on10, off10))
+
+
+def decode_stats(payload):
+    """OP_STATS payload -> (loops per second, strip.show() calls per second)."""
+    if len(payload) < 6:
+        return None
+    return int.from_bytes(payload[0:4], "little"), int.from_bytes(payload[4:6], "little")
+
+
+def decode_ready(payload):
+    """OP_READY payload -> dict(version, pixels, max_segments)."""
+    if len(payload) < 4:
+        return None
+    return {
+        "version": payload[0],
+        "pixels": int.from_bytes(payload[1:3], "little"),
+        "max_segments": payload[3],
+    }
+
+
+class Frame:
+    """One decoded frame."""
+    __slots__ = ("version", "seq", "op", "payload")
+
+    def __init__(self, version, seq, op, payload):
+        self.version = version
+        self.seq = seq
+        self.op = op
+        self.payload = payload
+
+    def __repr__(self):
+        name = OP_NAMES.get(self.op, hex(self.op))
+        return f"Frame(seq={self.seq}, op={name}, payload={self.payload.hex()})"
+
+
+class FrameParser:
+    """Incremental byte-at-a-time decoder, mirrors the sketch's parser.
+
+    feed() returns the list of complete, CRC-valid frames. Frames with a bad
+    version, length or CRC are counted and dropped; `on_reject(seq, reason)`,
+    if given, is called for each with the NACK_* reason and the sequence
+    number the sketch would NACK with (0 when the version byte was bad,
+    since the sequence number comes after it).
+    """
+
+    def __init__(self, on_reject=None):
+        self.crc_errors = 0
+        self.version_errors = 0
+        self.length_errors = 0
+        self.on_reject = on_reject
+        self._reset()
+
+    def _reset(self):
+        self._buf = bytearray()
+        self._need = None
+
+    def _reject(self, seq, reason):
+        if self.on_reject is not None:
+            self.on_reject(seq, reason)
+        self._reset()
+
+    def feed(self, data):
+        out = []
+        for b in data:
+            if not self._buf:
+                if b == SYNC:
+                    self._buf.append(b)
+                continue
+            self._buf.append(b)
+            n = len(self._buf)
+            if n == 2 and b != VERSION:
+                self.version_errors += 1
+                self._reject(0, NACK_BAD_VERSION)
+                if b == SYNC:
+                    self._buf.append(b)
+                continue
+            if n == 5:
+                if b > MAX_PAYLOAD:
+                    self.length_errors += 1
+                    self._reject(self._buf[2], NACK_TOO_LONG)
+                    continue
+                self._need = 5 + b + 1
+            if self._need is not None and n == self._need:
+                body = bytes(self._buf[1:-1])
+                if crc8(body) == self._buf[-1]:
+                    out.append(Frame(body[0], body[1], body[2], body[4:]))
+                    self._reset()
+                else:
+                    self.crc_errors += 1
+                    self._reject(body[1], NACK_BAD_CRC)
+        return out
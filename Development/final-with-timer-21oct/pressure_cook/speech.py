@@ -0,0 +1,190 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for spoken feedback.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""TTS queue played one message at a time by a background worker."""
+
+import heapq
+import threading
+import time
+
+from .tracing import hop
+
+
+class SpeechItem:
+    """One queued message."""
+    __slots__ = ("message", "tag", "priority", "deadline", "enqueued", "token", "seq", "traces", "stopped")
+
+    def __init__(self, message, tag, priority, deadline, enqueued, token, seq, traces=()):
+        self.message = message
+        self.tag = tag
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued = enqueued
+        self.token = token
+        self.seq = seq
+        self.traces = tuple(traces)    # AlertTraces that get a speech_start hop
+        self.stopped = False           # set by preempt()/withdraw() while it plays
+
+
+class Speaker:
+    """Priority queue of messages spoken through a SpeechSink (see backends.py).
+
+    Higher priority plays first, FIFO within a priority. A message may carry
+    a time to live: if it has not started by then it is dropped, so nothing
+    is announced after the condition it was about has gone. With
+    coalesce=True a message replaces a queued one with the same tag
+    (keeping its place) instead of queueing behind it. preempt() cuts off
+    a lower-priority message that is playing, withdraw() drops one tag, and
+    cancel() bumps a token so everything from before it is dropped;
+    `current_tag` is the tag of what is playing now.
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.proc = None
+        self.token = 0
+        self.current_tag = None
+        self._playing = None  # SpeechItem being spoken
+        self._heap = []       # (-priority, seq, SpeechItem)
+        self._seq = 0
+        self._cond = threading.Condition()
+
+        # Metrics
+        self.spoken = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.cancelled = 0
+        self.max_depth = 0
+        self.age_ms_avg = 0.0
+        self.age_ms_max = 0.0
+
+    def start(self):
+        threading.Thread(target=self._worker, daemon=True).start()
+        return self
+
+    @property
+    def depth(self):
+        return len(self._heap)
+
+    def clear_queue(self):
+        """Empty the TTS queue without blocking."""
+        with self._cond:
+            self.cancelled += len(self._heap)
+            self._heap.clear()
+
+    def cancel(self):
+        """Stop any currently playing or queued speech."""
+        self.token += 1
+        self.clear_queue()
+        proc = self.proc
+        if proc and proc.poll() is None:
+            try:
+                proc.terminate()
+            except Exception:
+                pass
+        self.current_tag = None
+
+    def preempt(self, priority):
+        """Cut off the message playing now if its priority is lower. Queued ones stay:
+        they play afterwards, or expire if their time to live runs out first."""
+        item = self._playing
+        if item is not None and item.priority < priority:
+            self._stop(item)
+
+    def withdraw(self, tag):
+        """Drop the queued messages with `tag` and stop it if it is playing (its condition is over)."""
+        with self._cond:
+            kept = [entry for entry in self._heap if entry[2].tag != tag]
+            self.cancelled += len(self._heap) - len(kept)
+            self._heap[:] = kept
+            heapq.heapify(self._heap)
+        item = self._playing
+        if item is not None and item.tag == tag:
+            self._stop(item)
+
+    def _stop(self, item):
+        with self._cond:
+            if not item.stopped:
+                item.stopped = True
+                self.cancelled += 1
+
+    def speak(self, message, tag=None, priority=0, ttl=None, coalesce=False, traces=()):
+        """Add a message to the speech queue; it is dropped if it can't start within `ttl` seconds."""
+        now = time.time()
+        deadline = now + ttl if ttl is not None else None
+        with self._cond:
+            if coalesce and tag is not None:
+                for i, (_, seq, item) in enumerate(self._heap):
+                    if item.tag == tag and item.token == self.token:
+                        item.message = message
+                        item.deadline = deadline
+                        item.priority = max(item.priority, priority)
+                        item.traces += tuple(traces)
+                        self._heap[i] = (-item.priority, seq, item)
+                        heapq.heapify(self._heap)
+                        self.coalesced += 1
+                        return
+            self._seq += 1
+            item = SpeechItem(message, tag, priority, deadline, now, self.token, self._seq, traces)
+            heapq.heappush(self._heap, (-priority, self._seq, item))
+            self.max_depth = max(self.max_depth, len(self._heap))
+            self._cond.notify()
+
+    def busy(self):
+        """True while something is playing or waiting to play."""
+        return self.current_tag is not None or bool(self._heap)
+
+    def _next(self):
+        """Block until a current, unexpired message is at the head of the queue; return it."""
+        with self._cond:
+            while True:
+                while not self._heap:
+                    self._cond.wait()
+                item = heapq.heappop(self._heap)[2]
+                if item.token != self.token:
+                    self.cancelled += 1
+                    continue
+                now = time.time()
+                if item.deadline is not None and now > item.deadline:
+                    self.expired += 1
+                    continue
+                self._account((now - item.enqueued) * 1000.0)
+                # Claim it before leaving the lock so busy() never sees a gap
+                self.current_tag = item.tag
+                self._playing = item
+                return item
+
+    def _account(self, age_ms):
+        self.spoken += 1
+        if self.spoken == 1:
+            self.age_ms_avg = age_ms
+        else:
+            self.age_ms_avg += 0.1 * (age_ms - self.age_ms_avg)
+        self.age_ms_max = max(self.age_ms_max, age_ms)
+
+    def _worker(self):
+        """Background thread that plays queued TTS messages."""
+        while True:
+            item = self._next()
+            my_token = item.token
+            try:
+                self.proc = self.sink.speak(item.message)
+                hop(item.traces, "speech_start")
+                while True:
+                    if my_token != self.token or item.stopped:
+                        if self.proc and self.proc.poll() is None:
+                            self.proc.terminate()
+                        break
+                    if self.proc.poll() is not None:
+                        break
+                    time.sleep(0.05)
+            finally:
+                self.proc = None
+                self._playing = None
+                self.current_tag = None
+
+    def format_summary(self):
+        return (f"Speech: {self.spoken} spoken, {self.coalesced} coalesced, {self.expired} expired, "
+                f"{self.cancelled} cancelled; queue depth max {self.max_depth}, "
+                f"age at start {self.age_ms_avg:.0f} ms avg / {self.age_ms_max:.0f} ms max")
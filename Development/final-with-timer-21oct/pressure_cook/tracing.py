@@ -0,0 +1,138 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for alert priorities.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""End-to-end alert latency: from the moment a problem is captured to light and voice.
+
+Each detected event (a marker leaving its tray, the room getting too loud)
+gets an AlertTrace with an id. It travels with the alert through the
+alert controller, the LED link and the speech queue, and every stage adds
+a timestamp (time.time(), the clock audio blocks are stamped with):
+
+  capture      - camera frame read / audio block recorded
+  detect       - the vision loop saw the event
+  arbitration  - the alert controller let the alert through
+  serial_write - the LED command went out on the serial port
+  led_ack      - the Arduino acknowledged it (the light is showing)
+  speech_start - the speech backend started saying the message
+
+Hops that never happen (the alert lost arbitration, LEDs unchanged) are
+simply missing from that trace; one that never got to speech_start by
+the end of the session is saved with "open": true.
+"""
+
+import itertools
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+HOPS = ("detect", "arbitration", "serial_write", "led_ack", "speech_start")
+
+
+class AlertTrace:
+    """Timestamps of one alert's way through the system."""
+    __slots__ = ("trace_id", "kind", "capture", "hops")
+
+    def __init__(self, trace_id, kind, capture):
+        self.trace_id = trace_id
+        self.kind = kind
+        self.capture = capture
+        self.hops = {}
+
+    def hop(self, name, t=None):
+        """Record a hop; only the first time counts (resends, repeated updates)."""
+        if name not in self.hops:
+            self.hops[name] = time.time() if t is None else t
+
+    def latency_ms(self, name):
+        t = self.hops.get(name)
+        return None if t is None else (t - self.capture) * 1000.0
+
+    @property
+    def open(self):
+        return HOPS[-1] not in self.hops
+
+    def as_dict(self):
+        d = {"id": self.trace_id, "kind": self.kind, "capture": self.capture,
+             **{f"{h}_ms": round(self.latency_ms(h), 2) for h in HOPS if h in self.hops}}
+        if self.open:
+            d["open"] = True
+        return d
+
+
+def hop(traces, name, t=None):
+    """Record hop `name` on every trace in `traces` (any iterable, may be empty)."""
+    if traces:
+        t = time.time() if t is None else t
+        for trace in traces:
+            trace.hop(name, t)
+
+
+class AlertTracer:
+    """Hands out traces and keeps the last `keep` for the latency report.
+
+    With a `path`, traces that drop out of the kept window are appended to
+    it as JSON lines, and close() writes the rest, so the file has every
+    trace of the session however long it ran.
+    """
+
+    def __init__(self, keep=1000, path=None):
+        self.traces = deque(maxlen=keep)
+        self.path = path
+        self.written = 0
+        self._out = None
+        self._ids = itertools.count(1)
+
+    def start(self, kind, capture, detect=None):
+        if self.path and len(self.traces) == self.traces.maxlen:
+            self._write(self.traces[0])    # about to drop out of the window
+        trace = AlertTrace(f"{kind}-{next(self._ids)}", kind, capture)
+        trace.hop("detect", detect)
+        self.traces.append(trace)
+        return trace
+
+    def latency_table(self):
+        """{kind: {hop: (n, p50_ms, p95_ms, max_ms)}} over the kept traces."""
+        table = {}
+        for kind in sorted({t.kind for t in self.traces}):
+            rows = {}
+            for h in HOPS:
+                ms = [t.latency_ms(h) for t in self.traces if t.kind == kind and h in t.hops]
+                if ms:
+                    p50, p95 = np.percentile(ms, (50, 95))
+                    rows[h] = (len(ms), float(p50), float(p95), max(ms))
+            table[kind] = rows
+        return table
+
+    def format_summary(self):
+        table = self.latency_table()
+        if not table:
+            return ["Alert latency: no alerts traced"]
+        lines = []
+        for kind, rows in table.items():
+            n_open = sum(1 for t in self.traces if t.kind == kind and t.open)
+            lines.append(f"Alert latency ({kind}, from capture): " + "  ".join(
+                f"{h} {p50:.0f}/{p95:.0f} ms (n={n})" for h, (n, p50, p95, _) in rows.items())
+                + (f"; {n_open} never spoken" if n_open else ""))
+        return lines
+
+    def _write(self, trace):
+        if self._out is None:
+            self._out = open(self.path, "w", encoding="utf-8")
+        self._out.write(json.dumps(trace.as_dict()) + "\n")
+        self.written += 1
+
+    def close(self):
+        """End of session: write the kept traces (open ones included) to `path` and close it.
+        Returns the path, or None without one."""
+        if not self.path:
+            return None
+        for trace in list(self.traces):
+            self._write(trace)
+        self.traces.clear()
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+        return self.path
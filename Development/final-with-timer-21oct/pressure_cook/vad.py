@@ -0,0 +1,39 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for sound recognition.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""Spectral voice-activity detection: is the noise people talking, or pans?
+
+Works on the BlockFeatures from features.py:
+  speech_ratio - share of the energy in the speech band (300-3400 Hz)
+  flatness     - spectral flatness inside that band; voiced speech is
+                 harmonic (low), fans and clatter are broadband (high)
+A block counts as speech when the ratio is high and the flatness low; the
+fraction of speech blocks is smoothed over `smooth_sec` and `voice_active`
+switches with hysteresis on it.
+"""
+
+import math
+
+
+class SpectralVad:
+    """Streaming voice-activity decision; O(1) per block on top of the features."""
+
+    def __init__(self, block_sec, ratio_min=0.5, flatness_max=0.35, smooth_sec=0.8):
+        self.ratio_min = ratio_min
+        self.flatness_max = flatness_max
+        self._alpha = 1.0 - math.exp(-block_sec / max(smooth_sec, block_sec))
+
+        self.is_speech = False
+        self.voice_score = 0.0
+        self.voice_active = False
+
+    def update(self, features):
+        """Feed one block's features; returns voice_active."""
+        self.is_speech = features.speech_ratio >= self.ratio_min and features.flatness <= self.flatness_max
+        self.voice_score += self._alpha * ((1.0 if self.is_speech else 0.0) - self.voice_score)
+        if self.voice_score >= 0.5:
+            self.voice_active = True
+        elif self.voice_score <= 0.3:
+            self.voice_active = False
+        return self.voice_active
@@ -0,0 +1,348 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code to simulate the LED Arduino.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""Virtual LED Arduino speaking the merged-arduino.ino protocol over a pseudo-terminal.
+
+    python -m pressure_cook.virtual_arduino --link /tmp/pressure-cook-arduino
+    python time-up-merged.py --serial-port /tmp/pressure-cook-arduino
+
+VirtualLedController mirrors the sketch's logic (states, ANIMATE programs,
+segments, dirty rendering, telemetry). run_pty() puts it behind a pty and
+models the wire time at the configured baud rate, the loop period and the
+time strip.show() spends with interrupts off.
+"""
+
+import argparse
+import os
+import select
+import sys
+import time
+
+from . import protocol
+
+# Blink timings per preset state, as in enter() in the sketch
+_PRESET_PERIODS = {
+    "BLUE_BLINK": 200,
+    "RED_BLINK": 250,
+    "YELLOW_BLINK": 350,
+    "PINK_BLINK": 400,
+    "WHITE_BLINK": 300,
+}
+SHOW_US_PER_PIXEL = 30.0    # WS2812 at 800 kHz: 24 bits per pixel
+UART_RX_BYTES = 2           # ATmega328P receive buffer; a longer show() overruns it
+STATS_PERIOD = 1.0
+
+
+class _Anim:
+    __slots__ = ("color", "on_ms", "off_ms", "by_count", "repeats_left", "end_at",
+                 "fallback", "seq", "on", "last_toggle")
+
+    def __init__(self):
+        self.color = (0, 0, 0)
+        self.on_ms = self.off_ms = 0
+        self.by_count = False
+        self.repeats_left = 0
+        self.end_at = None
+        self.fallback = 0
+        self.seq = 0
+        self.on = False
+        self.last_toggle = 0.0
+
+
+class _Segment:
+    __slots__ = ("start", "count", "active", "color", "on_ms", "off_ms", "on", "last_toggle")
+
+    def __init__(self, start, count):
+        self.start = start
+        self.count = count
+        self.active = False
+        self.color = (0, 0, 0)
+        self.on_ms = self.off_ms = 0
+        self.on = False
+        self.last_toggle = 0.0
+
+
+class VirtualLedController:
+    """In-process model of merged-arduino.ino.
+
+    feed(data, now) and tick(now) return the bytes the board would send back.
+    `pixels` holds the last frame pushed with show().
+    """
+
+    def __init__(self, num_pixels=protocol.DEFAULT_LED_COUNT, log=None):
+        self.num_pixels = num_pixels
+        self.log = log
+        self.parser = protocol.FrameParser(on_reject=self._nack)
+        self._nacks = bytearray()
+        self.pixels = [(0, 0, 0)] * num_pixels
+        self.state = "OFF"
+        self.anim = _Anim()
+        self.segments = []
+        self.dirty = True
+        self.shows = 0
+        self.loops = 0
+        self.commands = 0
+        self._stats_loops = 0
+        self._stats_shows = 0
+        self._last_stats = None
+        self.enter("OFF", 0.0)
+
+    # --- sketch logic -------------------------------------------------
+
+    def enter(self, state, now):
+        self.state = state
+        a = self.anim
+        a.color = protocol.STATE_COLORS.get(state, (0, 0, 0))
+        a.on = state == "GREEN"
+        a.by_count = False
+        a.end_at = None
+        a.on_ms = a.off_ms = _PRESET_PERIODS.get(state, 0)
+        a.last_toggle = now
+        self.dirty = True
+
+    def _start_animation(self, seq, p, now):
+        if len(p) < 11 or p[10] not in protocol.STATE_NAMES:
+            return False
+        a = self.anim
+        self.state = "CUSTOM"
+        a.color = (p[0], p[1], p[2])
+        a.on_ms = p[3] | (p[4] << 8)
+        a.off_ms = p[5] | (p[6] << 8)
+        a.by_count = p[7] > 0 and a.off_ms > 0
+        a.repeats_left = p[7]
+        dur = p[8] | (p[9] << 8)
+        if p[7] > 0 and a.off_ms == 0:
+            # Steady with a repeat count: hold for that many on-periods (or the duration, if shorter)
+            steady = max(a.on_ms, 1) * p[7]
+            dur = steady if dur == 0 else min(dur, steady)
+        a.end_at = now + dur / 1000.0 if dur else None
+        a.fallback = p[10]
+        a.seq = seq
+        a.on = True
+        a.last_toggle = now
+        self.dirty = True
+        return True
+
+    def _configure_segments(self, p):
+        if len(p) < 1 or p[0] > protocol.MAX_SEGMENTS or len(p) < 1 + 4 * p[0]:
+            return False
+        segs = []
+        for i in range(p[0]):
+            e = p[1 + 4 * i:5 + 4 * i]
+            start, count = e[0] | (e[1] << 8), e[2] | (e[3] << 8)
+            if start + count > self.num_pixels:
+                return False
+            segs.append(_Segment(start, count))
+        self.segments = segs
+        self.dirty = True
+        return True
+
+    def _update_segments(self, p, now):
+        size = protocol.SEG_ENTRY_SIZE
+        if len(p) % size or any(p[i] >= len(self.segments) for i in range(0, len(p), size)):
+            return False
+        for i in range(0, len(p), size):
+            e = p[i:i + size]
+            sg = self.segments[e[0]]
+            sg.active = bool(e[1] & protocol.SEG_ACTIVE)
+            sg.color = (e[2], e[3], e[4])
+            sg.on_ms, sg.off_ms = e[5] * 10, e[6] * 10
+            sg.on = True
+            sg.last_toggle = now
+        self.dirty = True
+        return True
+
+    def render(self):
+        """Push the frame if it changed; returns True when show() ran."""
+        if not self.dirty:
+            return False
+        a = self.anim
+        px = [a.color if a.on else (0, 0, 0)] * self.num_pixels
+        for sg in self.segments:
+            if sg.active:
+                px[sg.start:sg.start + sg.count] = [sg.color if sg.on else (0, 0, 0)] * sg.count
+        self.pixels = px
+        self.shows += 1
+        self._stats_shows += 1
+        self.dirty = False
+        return True
+
+    def _ack(self, seq, op, status=protocol.STATUS_OK):
+        return protocol.encode_frame(seq, protocol.OP_ACK, bytes((op, status)))
+
+    def _dispatch(self, frame, now):
+        self.commands += 1
+        op, p = frame.op, frame.payload
+        if self.log:
+            self.log(f"{now:10.3f} rx seq={frame.seq:3d} {protocol.OP_NAMES.get(op, hex(op))} {p.hex()}")
+        if op == protocol.OP_PING:
+            return self._ack(frame.seq, op)
+        if op == protocol.OP_SET_STATE:
+            if len(p) < 1 or p[0] not in protocol.STATE_NAMES:
+                return self._ack(frame.seq, op, protocol.STATUS_BAD_PARAM)
+            self.enter(protocol.STATE_NAMES[p[0]], now)
+        elif op == protocol.OP_ANIMATE:
+            if not self._start_animation(frame.seq, p, now):
+                return self._ack(frame.seq, op, protocol.STATUS_BAD_PARAM)
+        elif op == protocol.OP_SEG_CONFIG:
+            if not self._configure_segments(p):
+                return self._ack(frame.seq, op, protocol.STATUS_BAD_PARAM)
+        elif op == protocol.OP_SEG_UPDATE:
+            if not self._update_segments(p, now):
+                return self._ack(frame.seq, op, protocol.STATUS_BAD_PARAM)
+        else:
+            return self._ack(frame.seq, op, protocol.STATUS_BAD_OPCODE)
+        self.render()
+        return self._ack(frame.seq, op)
+
+    def feed(self, data, now):
+        """Bytes received from the host -> reply bytes."""
+        out = bytearray()
+        for b in data:
+            # A byte at a time so replies come out in the order the sketch sends them
+            for frame in self.parser.feed((b,)):
+                out += self._dispatch(frame, now)
+            if self._nacks:
+                out += self._nacks
+                self._nacks.clear()
+        return bytes(out)
+
+    def _nack(self, seq, reason):
+        """FrameParser.on_reject: NACK like the sketch (received seq, or 0 for a bad version)."""
+        self._nacks += protocol.encode_frame(seq, protocol.OP_NACK, bytes((reason,)))
+
+    def _finish_animation(self, now):
+        seq = self.anim.seq
+        self.enter(protocol.STATE_NAMES[self.anim.fallback], now)
+        self.render()
+        return protocol.encode_frame(seq, protocol.OP_DONE, bytes((protocol.DONE_COMPLETED,)))
+
+    def tick(self, now):
+        """One pass of loop() after serial handling -> unsolicited bytes (DONE, STATS)."""
+        out = bytearray()
+        self.loops += 1
+        self._stats_loops += 1
+        a = self.anim
+        finished = False
+        if a.off_ms > 0 and (now - a.last_toggle) * 1000.0 >= (a.on_ms if a.on else a.off_ms):
+            a.on = not a.on
+            a.last_toggle = now
+            self.dirty = True
+            if not a.on and a.by_count:
+                a.repeats_left -= 1
+                if a.repeats_left <= 0:
+                    out += self._finish_animation(now)
+                    finished = True
+        if not finished and a.end_at is not None and now >= a.end_at:
+            out += self._finish_animation(now)
+        for sg in self.segments:
+            if sg.active and sg.off_ms > 0 and (now - sg.last_toggle) * 1000.0 >= (sg.on_ms if sg.on else sg.off_ms):
+                sg.on = not sg.on
+                sg.last_toggle = now
+                self.dirty = True
+        self.render()
+
+        if self._last_stats is None:
+            self._last_stats = now
+        elif now - self._last_stats >= STATS_PERIOD:
+            dt = now - self._last_stats
+            hz = int(self._stats_loops / dt)
+            payload = hz.to_bytes(4, "little") + min(0xFFFF, self._stats_shows).to_bytes(2, "little")
+            out += protocol.encode_frame(0, protocol.OP_STATS, payload)
+            self._stats_loops = self._stats_shows = 0
+            self._last_stats = now
+        return bytes(out)
+
+
+def _wire_time(nbytes, baud):
+    """Seconds to clock nbytes over a UART (8N1 = 10 bits per byte)."""
+    return nbytes * 10.0 / baud
+
+
+def run_pty(controller, baud=protocol.BAUD_RATE, loop_us=100.0, link=None, duration=None):
+    """Serve `controller` on a new pseudo-terminal until interrupted.
+
+    loop_us is the sketch's loop() time without show(); show() adds
+    SHOW_US_PER_PIXEL per pixel while the "interrupts are off".
+    """
+    import pty
+    import tty
+
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    path = os.ttyname(slave)
+    if link:
+        try:
+            os.unlink(link)
+        except FileNotFoundError:
+            pass
+        os.symlink(path, link)
+    print(f"🔌 Virtual Arduino on {link or path} ({baud} baud, {controller.num_pixels} px)", flush=True)
+
+    show_s = controller.num_pixels * SHOW_US_PER_PIXEL / 1e6
+    if show_s > _wire_time(UART_RX_BYTES, baud):
+        print(f"⚠ show() keeps interrupts off {show_s * 1000:.2f} ms = {show_s / _wire_time(1, baud):.0f} byte times; "
+              f"a real board drops host bytes beyond the first {UART_RX_BYTES} that arrive during it", flush=True)
+    ready = bytes((protocol.VERSION,)) + controller.num_pixels.to_bytes(2, "little") + bytes((protocol.MAX_SEGMENTS,))
+    os.write(master, protocol.encode_frame(0, protocol.OP_READY, ready))
+    t0 = time.perf_counter()
+    try:
+        while duration is None or time.perf_counter() - t0 < duration:
+            ready, _, _ = select.select([master], [], [], loop_us / 1e6)
+            out = bytearray()
+            if ready:
+                try:
+                    data = os.read(master, 256)
+                except OSError:
+                    data = b""
+                if data:
+                    # Bytes trickle in at the baud rate; the board can't act before the last one lands
+                    time.sleep(_wire_time(len(data), baud))
+                    shows = controller.shows
+                    out += controller.feed(data, time.perf_counter() - t0)
+                    time.sleep(show_s * (controller.shows - shows))
+            shows = controller.shows
+            out += controller.tick(time.perf_counter() - t0)
+            time.sleep(show_s * (controller.shows - shows))
+            if out:
+                time.sleep(_wire_time(len(out), baud))
+                os.write(master, bytes(out))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if link:
+            try:
+                os.unlink(link)
+            except OSError:
+                pass
+        os.close(master)
+        os.close(slave)
+        print(f"🔚 Virtual Arduino: {controller.commands} commands, {controller.shows} shows, "
+              f"{controller.loops} loops", flush=True)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Virtual LED Arduino on a pseudo-terminal")
+    ap.add_argument("--link", default=None,
+                    help="Also expose the pty under this path (e.g. /tmp/pressure-cook-arduino)")
+    ap.add_argument("--baud", type=int, default=protocol.BAUD_RATE, help="Modelled UART baud rate")
+    ap.add_argument("--pixels", type=int, default=protocol.DEFAULT_LED_COUNT, help="Modelled strip length")
+    ap.add_argument("--loop-us", type=float, default=100.0, help="Modelled loop() time without show()")
+    ap.add_argument("--log", default="-", help="Command log file ('-' = stdout, '' = off)")
+    ap.add_argument("--seconds", type=float, default=None, help="Stop after this long (soak tests)")
+    args = ap.parse_args(argv)
+
+    log = None
+    if args.log == "-":
+        log = lambda line: print(line, flush=True)
+    elif args.log:
+        fh = open(args.log, "a", encoding="utf-8")
+        log = lambda line: (fh.write(line + "\n"), fh.flush())
+
+    run_pty(VirtualLedController(args.pixels, log=log), baud=args.baud,
+            loop_us=args.loop_us, link=args.link, duration=args.seconds)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for camera tracking.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""ArUco marker detection and the preview overlay."""
+
+import math
+
+import cv2
+import cv2.aruco as aruco
+import numpy as np
+
+
+class MarkerDetector:
+    """ArUco marker detection (DICT_4X4_50), across old and new cv2.aruco APIs."""
+
+    def __init__(self):
+        self.aruco_dict = aruco.getPredefinedDictionary(aruco.DICT_4X4_50)
+        self.parameters = aruco.DetectorParameters()
+        self.detector = aruco.ArucoDetector(self.aruco_dict, self.parameters) if hasattr(aruco, "ArucoDetector") else None
+
+    def to_gray(self, frame):
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def detect_gray(self, gray):
+        if self.detector is not None:
+            corners, ids, _ = self.detector.detectMarkers(gray)
+        elif hasattr(aruco, "detectMarkers"):
+            corners, ids, _ = aruco.detectMarkers(gray, self.aruco_dict, parameters=self.parameters)
+        else:
+            raise AttributeError("cv2.aruco does not expose detectMarkers or ArucoDetector")
+        return corners, ids
+
+    def detect(self, frame):
+        """Detect ArUco markers in the frame."""
+        return self.detect_gray(self.to_gray(frame))
+
+
+def marker_center(corner):
+    pts = corner[0].astype(int)
+    return pts, (int(pts[:, 0].mean()), int(pts[:, 1].mean()))
+
+
+def draw_marker(frame, pts, center, marker_id, in_tray):
+    color = (255, 0, 0) if not in_tray else (0, 255, 0)
+    cx, cy = center
+    cv2.polylines(frame, [pts], True, color, 2)
+    cv2.putText(frame, f"Marker {marker_id}: {'OUT!' if not in_tray else 'In tray'}",
+                (cx, cy - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+
+
+def draw_stations(frame, station_map):
+    """Draw station zones on frame."""
+    for s_name, rect in station_map.rects.items():
+        if s_name in station_map.polys:
+            pts = np.array(station_map.polys[s_name], np.int32)
+            cv2.polylines(frame, [pts], True, (0, 0, 255), 2)
+            M = pts.mean(axis=0).astype(int)
+            cv2.putText(frame, s_name, (int(M[0]), int(M[1]) - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+        else:
+            x, y, w, h = rect
+            cv2.rectangle(frame, (x, y, x + w, y + h), (0, 0, 255), 2)
+            cv2.putText(frame, s_name, (x, y - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+
+
+def draw_audio_bar(frame, avg_db, loud, trig_db, rel_db, floor_db=None, voice=None):
+    """Draw audio level bar on frame (with the tracked noise floor in adaptive mode)."""
+    lo, hi = -60.0, 0.0
+    pct = 0.0 if avg_db <= lo else (1.0 if avg_db >= hi else (avg_db - lo) / (hi - lo))
+    bar_w, bar_h = 200, 14
+    x0, y0 = 20, 20
+    cv2.rectangle(frame, (x0, y0), (x0 + bar_w, y0 + bar_h), (60, 60, 60), 1)
+    cv2.rectangle(frame, (x0, y0), (x0 + int(bar_w * pct), y0 + bar_h),
+                  (0, 200, 0) if not loud else (0, 140, 255), -1)
+    text = f"avg {avg_db:5.1f} dBFS  trig {trig_db:.1f}  rel {rel_db:.1f}"
+    if floor_db is not None:
+        text += f"  floor {floor_db:.1f}"
+    if voice is not None:
+        text += "  voice" if voice else "  no voice"
+    cv2.putText(frame, text,
+                (x0, y0 + bar_h + 16), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255,255,255), 1, cv2.LINE_AA)
+    return y0 + bar_h + 16
+
+
+def draw_audio_features(frame, f, y):
+    """One line with the latest block's features under the audio bar."""
+    cv2.putText(frame, f"peak {f.peak_db:5.1f}  crest {f.crest_db:4.1f} dB  zcr {f.zcr:.3f}  "
+                       f"centroid {f.centroid_hz:4.0f} Hz",
+                (20, y), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (200, 200, 200), 1, cv2.LINE_AA)
+
+
+def draw_acoustics(frame, acoustics, y):
+    """Leq of each horizon and the task's exceedance levels, under the features line."""
+    leq = "  ".join(f"{name} {v[0]:.1f}" for name, v in acoustics.items() if not math.isnan(v[0]))
+    if not leq:
+        return
+    text = f"Leq {leq}"
+    _, l10, l50, l90 = acoustics.get("task", (math.nan,) * 4)
+    if not math.isnan(l10):
+        text += f"   task L10/L50/L90 {l10:.0f}/{l50:.0f}/{l90:.0f}"
+    cv2.putText(frame, text, (20, y), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (200, 200, 200), 1, cv2.LINE_AA)
+
+
+def draw_profile(frame, lines):
+    """Frame profiler table (fps, then stage p50/p95/p99) in the top-right corner."""
+    x = max(10, frame.shape[1] - 290)
+    for i, line in enumerate(lines):
+        cv2.putText(frame, line, (x, 20 + 16 * i), cv2.FONT_HERSHEY_PLAIN, 0.9, (0, 255, 255), 1, cv2.LINE_AA)
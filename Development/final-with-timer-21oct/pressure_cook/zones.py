@@ -0,0 +1,185 @@
+# We acknowledge using ChatGPT and Claude AI in developing this code for station zones.
+# We confirm that we fully understood all suggested changes and adjusted the code where needed.
+# we maintained control over the functionality and logic of the code at all times.
+
+"""Station geometry from config/zones.json (written by camera_calibrator.py)."""
+
+import json
+import os
+
+from . import protocol
+
+STATION_KEYS = ["station1", "station2", "station3"]
+
+# Station definitions (fallback rectangles if no polygons)
+STATION_RECTS = {
+    "station1": (50, 100, 200, 200),
+    "station2": (300, 100, 200, 200),
+    "station3": (550, 100, 200, 200)
+}
+
+MARKER_TO_STATION = {1: "station1", 2: "station2", 3: "station3"}
+CAMERA_MARKERS = [1, 2, 3]
+
+_HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ZONES_CANDIDATES = (
+    "zones.json",
+    os.path.join("config", "zones.json"),
+    os.path.join(_HERE, "config", "zones.json"),
+)
+
+
+def _read_zones_json():
+    for zp in ZONES_CANDIDATES:
+        if os.path.exists(zp):
+            try:
+                with open(zp, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception:
+                return {}
+    return {}
+
+
+def load_station_polys(data=None):
+    """Load polygon definitions for stations from zones.json if available."""
+    if data is None:
+        data = _read_zones_json()
+    name_map = {k.upper(): k for k in STATION_KEYS}
+    out = {}
+    try:
+        for z in data.get("zones", []):
+            name = str(z.get("name", "")).strip().upper()
+            pts = z.get("pts") or []
+            if name in name_map and len(pts) >= 3:
+                out[name_map[name]] = [(int(x), int(y)) for x, y in pts]
+    except Exception:
+        return {}
+    return out
+
+
+def load_led_segments(data=None, led_count=protocol.DEFAULT_LED_COUNT):
+    """Pixel range (start, count) per station.
+
+    Read from "led_segments" in zones.json, e.g. {"STATION1": [0, 10]};
+    stations without an entry get an even share of the strip.
+    """
+    if data is None:
+        data = _read_zones_json()
+    share = led_count // len(STATION_KEYS)
+    out = {k: (i * share, share) for i, k in enumerate(STATION_KEYS)}
+    try:
+        for name, rng in (data.get("led_segments") or {}).items():
+            key = str(name).strip().lower()
+            if key in out and len(rng) == 2:
+                out[key] = (int(rng[0]), int(rng[1]))
+    except Exception:
+        pass
+    return out
+
+
+def load_mic_channels(data=None):
+    """Input channel -> station, from "mic_channels" in zones.json, e.g. {"STATION1": 0}.
+
+    Without an entry, channel i belongs to the i-th station.
+    """
+    if data is None:
+        data = _read_zones_json()
+    out = {i: k for i, k in enumerate(STATION_KEYS)}
+    try:
+        mapping = data.get("mic_channels") or {}
+        if mapping:
+            out = {}
+        for name, ch in mapping.items():
+            key = str(name).strip().lower()
+            if key in STATION_KEYS:
+                out[int(ch)] = key
+    except Exception:
+        pass
+    return out
+
+
+def load_sound_bearings(data=None):
+    """Bearing range (lo, hi) in degrees per station for TDOA localization.
+
+    Read from "sound_bearings" in zones.json, e.g. {"STATION1": [-90, -30]};
+    without it -90..90 is split evenly, station1 on the first mic's side.
+    """
+    if data is None:
+        data = _read_zones_json()
+    width = 180.0 / len(STATION_KEYS)
+    out = {k: (-90.0 + i * width, -90.0 + (i + 1) * width) for i, k in enumerate(STATION_KEYS)}
+    try:
+        for name, rng in (data.get("sound_bearings") or {}).items():
+            key = str(name).strip().lower()
+            if key in out and len(rng) == 2:
+                out[key] = (float(rng[0]), float(rng[1]))
+    except Exception:
+        pass
+    return out
+
+
+def load_mic_array(data=None):
+    """(channel pair, spacing in metres) of the localization mics, from "mic_array" in zones.json."""
+    if data is None:
+        data = _read_zones_json()
+    pair, spacing = (0, 1), 0.5
+    try:
+        arr = data.get("mic_array") or {}
+        if len(arr.get("pair", ())) == 2:
+            pair = (int(arr["pair"][0]), int(arr["pair"][1]))
+        spacing = float(arr.get("spacing_m", spacing))
+    except Exception:
+        pass
+    return pair, spacing
+
+
+def station_label(key):
+    """'station2' -> 'station 2', for spoken messages."""
+    return key.replace("station", "station ") if key else ""
+
+
+def point_in_poly(x, y, poly):
+    """Ray casting algorithm to check if point is inside polygon."""
+    inside = False
+    n = len(poly)
+    for i in range(n):
+        x1, y1 = poly[i]
+        x2, y2 = poly[(i+1) % n]
+        if ((y1 > y) != (y2 > y)) and (x < (x2 - x1) * (y - y1) / (y2 - y1 + 1e-9) + x1):
+            inside = not inside
+    return inside
+
+
+class StationMap:
+    """Station polygons/rectangles and their LED segments, loaded once."""
+
+    def __init__(self, data=None):
+        if data is None:
+            data = _read_zones_json()
+        self.polys = load_station_polys(data)
+        self.rects = dict(STATION_RECTS)
+        self.led_segments = load_led_segments(data)
+        self.segment_index = {k: i for i, k in enumerate(sorted(self.led_segments))}
+        self.mic_channels = load_mic_channels(data)
+        self.sound_bearings = load_sound_bearings(data)
+        self.mic_pair, self.mic_spacing = load_mic_array(data)
+
+    def segment_ranges(self):
+        """(start, count) per segment id, ready for LedLink.configure_segments()."""
+        return [self.led_segments[k] for k in sorted(self.segment_index, key=self.segment_index.get)]
+
+    def is_in_tray(self, center, station_key):
+        """Check if marker center is inside station (polygon or rectangle)."""
+        cx, cy = center
+        if station_key in self.polys:
+            return point_in_poly(cx, cy, self.polys[station_key])
+        x, y, w, h = self.rects[station_key]
+        return x <= cx <= x + w and y <= cy <= y + h
+
+    def center(self, key):
+        """Middle of a station (used to place the fake camera's markers)."""
+        if key in self.polys:
+            pts = self.polys[key]
+            return (int(sum(p[0] for p in pts) / len(pts)), int(sum(p[1] for p in pts) / len(pts)))
+        x, y, w, h = self.rects[key]
+        return x + w // 2, y + h // 2
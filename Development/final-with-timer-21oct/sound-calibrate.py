@@ -2,11 +2,17 @@
 # We confirm that we fully understood all suggested changes and adjusted the code where needed.
 # we maintained control over the functionality and logic of the code at all times.
 
-# Usage: python3 calibrate.py --in <input_device> --sr 44100 --seconds 20 --hp 100
-# Example: python3 calibrate.py --in 2 --sr 44100
+# Usage: python3 sound-calibrate.py --in <input_device> --sr 44100 --seconds 20 --hp 100
+# Example: python3 sound-calibrate.py --in 2 --sr 44100
+#          python3 sound-calibrate.py --in 2 3 --seconds 0    (two mics, until Ctrl+C)
 
-import json, time, math, numpy as np, sounddevice as sd
-import argparse, statistics as stats
+import json, time, sounddevice as sd
+import argparse
+
+from pressure_cook import calibration
+from pressure_cook.audio import HighPass1
+from pressure_cook.features import FeatureExtractor
+from pressure_cook.level_stats import DbHistogram
 
 # Show all available audio devices
 print(json.dumps(sd.query_devices(), indent=2))
@@ -14,63 +20,84 @@ print("\nDefault devices (in, out):", sd.default.device)
 print("Default samplerate:", sd.query_devices(sd.default.device[0])["default_samplerate"])
 
 
-def hp1(x, sr, fc=100.0, z=[0.0], xprev=[0.0]):
-    """Single-pole high-pass filter to remove low-frequency noise.
-    Uses difference equation: y[n] = a*(y[n-1] + x[n] - x[n-1])
-    where a = RC/(RC+dt) and RC = 1/(2*pi*fc)"""
-    dt = 1.0/sr
-    RC = 1.0/(2*math.pi*fc)
-    a = RC/(RC+dt)
-    y = np.empty_like(x)
-    xn1 = xprev[0]
-    yn1 = z[0]
-    for i, xn in enumerate(x):
-        yn = a*(yn1 + xn - xn1)
-        y[i] = yn
-        yn1, xn1 = yn, xn
-    z[0], xprev[0] = yn1, xn1
-    return y
+class DeviceCalibration:
+    """Level statistics for one input device, fed from its own InputStream callback."""
+
+    def __init__(self, dev, sr, hp):
+        self.dev = dev
+        self.name = sd.query_devices(dev)["name"]
+        self.hp = HighPass1(sr, hp) if hp > 0 else None
+        self.features = FeatureExtractor(sr, 1024)
+        self.hist = DbHistogram()
 
+    def callback(self, indata, frames, time_info, status):
+        """Audio callback - processes each block and records its dB level."""
+        if status:
+            print(f"[{self.name}] {status}")
+        mono = indata[:, 0]
+        if self.hp is not None:
+            mono = self.hp(mono)
+        self.hist.add(self.features.compute(mono).rms_db)
 
-def block_db(buf):
-    """Calculate RMS level in dBFS for an audio buffer.
-    0 dBFS is full scale (peak = 1.0)"""
-    rms = np.sqrt(np.mean(buf**2) + 1e-12)
-    return 20*math.log10(rms + 1e-12)
+    def summary(self):
+        p50, p90, p95, p99 = self.hist.quantiles([0.50, 0.90, 0.95, 0.99])
+        return (f"mean {self.hist.mean:6.1f}  p50 {p50:6.1f}  p90 {p90:6.1f}  "
+                f"p95 {p95:6.1f}  p99 {p99:6.1f} dBFS  ({self.hist.n} blocks)")
 
 
 p = argparse.ArgumentParser()
-p.add_argument("--in", dest="in_dev", type=int, required=True, help="Input device index")
+p.add_argument("--in", dest="in_dev", type=int, nargs="+", required=True,
+               help="Input device index; give several to calibrate them in parallel")
 p.add_argument("--sr", dest="sr", type=int, default=48000, help="Sample rate (Hz)")
-p.add_argument("--seconds", type=int, default=20, help="Calibration duration")
+p.add_argument("--seconds", type=int, default=20, help="Calibration duration, 0 = until Ctrl+C")
 p.add_argument("--hp", type=float, default=100.0, help="High-pass cutoff (Hz), 0 to disable")
+p.add_argument("--report-every", dest="report_every", type=float, default=1.0,
+               help="Seconds between live level reports")
+p.add_argument("--profiles", default=calibration.PROFILES_PATH,
+               help="Where to save the calibration profile for each device")
+p.add_argument("--no-save", action="store_true", help="Only print the suggested thresholds")
 args = p.parse_args()
 
-sd.default.device = (args.in_dev, None)
 sr = args.sr
-vals = []
-
-
-def cb(indata, frames, time_info, status):
-    """Audio callback - processes each block and records dB levels."""
-    if status:
-        print(status)
-    mono = indata[:,0]
-    if args.hp > 0:
-        mono = hp1(mono, sr, args.hp)
-    vals.append(block_db(mono))
-
-
-with sd.InputStream(samplerate=sr, channels=1, callback=cb, blocksize=1024):
-    print(f"Calibrating for {args.seconds}s… talk at your normal level.")
-    t0 = time.time()
-    while time.time() - t0 < args.seconds:
+cals = [DeviceCalibration(dev, sr, args.hp) for dev in args.in_dev]
+streams = [sd.InputStream(device=c.dev, samplerate=sr, channels=1, callback=c.callback, blocksize=1024)
+           for c in cals]
+
+for st in streams:
+    st.start()
+how_long = f"for {args.seconds}s" if args.seconds > 0 else "until Ctrl+C"
+print(f"Calibrating {how_long}… talk at your normal level.")
+t0 = time.time()
+next_report = t0 + args.report_every
+try:
+    while args.seconds <= 0 or time.time() - t0 < args.seconds:
         time.sleep(0.1)
-
-avg = stats.fmean(vals)
-p95 = np.percentile(vals, 95)
-
-print(f"\nRoom dB (HPF {args.hp} Hz): avg={avg:.1f} dBFS, p95={p95:.1f} dBFS")
-print("Suggested thresholds:")
-print(f" trigger ~ {p95+6:.1f} dBFS")
-print(f" release ~ {p95+2:.1f} dBFS (4 dB below trigger)")
\ No newline at end of file
+        if time.time() >= next_report:
+            next_report += args.report_every
+            for c in cals:
+                print(f"{time.time() - t0:6.1f}s  [{c.name}] {c.summary()}")
+except KeyboardInterrupt:
+    pass
+finally:
+    for st in streams:
+        st.stop()
+        st.close()
+elapsed = time.time() - t0
+
+for c in cals:
+    if c.hist.n == 0:
+        print(f"\n⚠ [{c.name}] no audio received")
+        continue
+    avg = c.hist.mean
+    p10, p95 = c.hist.quantiles([0.10, 0.95])
+    trig, rel = calibration.suggest_thresholds(p95)
+
+    print(f"\n[{c.name}] Room dB (HPF {args.hp} Hz): avg={avg:.1f} dBFS, p95={p95:.1f} dBFS, noise floor (p10)={p10:.1f} dBFS")
+    print("Suggested thresholds:")
+    print(f" trigger ~ {trig:.1f} dBFS")
+    print(f" release ~ {rel:.1f} dBFS (4 dB below trigger)")
+
+    if not args.no_save:
+        profile = calibration.make_profile(c.name, sr, args.hp, p10, avg, p95, round(elapsed))
+        path = calibration.save_profile(profile, args.profiles)
+        print(f"✅ Saved profile for \"{c.name}\" to {path}; time-up-merged.py loads it automatically.")